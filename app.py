@@ -1,12 +1,55 @@
+import time
+
 import streamlit as st
 import numpy as np
-import yfinance as yf
-import plotly.graph_objects as go
-
-from utils.yf_data import get_option_chain, list_expirations
-from utils.visuals import plot_iv_smile, plot_option_price_heatmap
+import pandas as pd
+
+from utils.yf_data import MarketDataCache, get_cache, get_option_chain, get_spot, iter_option_surface, list_expirations, load_option_surface
+from utils.exposure import get_exposure
+from utils.greeks import time_to_expiry
+from utils.live import LiveChain
+from utils.profiling import current_session, profiler, stage
+from utils.surface import get_vol_surface
+from utils.scenarios import JumpParams, simulate_strategy
+from utils.snapshots import ReplayProvider, get_snapshot_store
+from utils.strategies import Leg, STRATEGY_TEMPLATES, strategy_payoff, strategy_summary
+from utils.visuals import plot_gamma_exposure, plot_pnl_distribution, plot_strategy_payoff, plot_term_structure, plot_vol_surface
 
 st.set_page_config(page_title="Options Dashboard", layout="wide")
+
+# Les options listées US (actions, ETF) sont américaines : BAW par défaut, arbre pour la précision
+EXERCISE_MODELS = {
+    "Européen (Black-Scholes)": None,
+    "Américain (BAW)": "baw",
+    "Américain (arbre Leisen-Reimer)": "lr",
+    "Américain (arbre CRR)": "crr",
+}
+
+with st.sidebar:
+    # Le profiling ne concerne que la session courante : les autres utilisateurs n'en paient pas le coût
+    session_id = current_session()
+    if st.toggle("⏱️ Profiling (debug)", value=profiler.enabled):
+        profiler.enable(session_id)
+        if not profiler.tracks_memory:
+            st.caption("Mémoire non suivie : lancer avec OPTIONS_DASHBOARD_PROFILE_MEMORY=1 (tracemalloc, tout le process).")
+    else:
+        profiler.disable(session_id)
+
+    snapshot_store = get_snapshot_store()
+    replay = snapshot_store is not None and st.toggle("⏪ Mode replay (snapshots)", value=False)
+    live = not replay and st.toggle("🔴 Live (auto-refresh)", value=False)
+    refresh_every = st.select_slider("Rafraîchissement (s)", options=[1, 2, 3, 5], value=2, disabled=not live)
+
+rerun_started = time.time()
+rerun_timer = stage("app.rerun")
+
+
+def show_chart(fig, name, container=st):
+    # Mesure la sérialisation Plotly + l'envoi au front séparément du calcul de la figure
+    with stage(f"render.{name}"):
+        container.plotly_chart(fig, use_container_width=True)
+
+
 st.title("Δ Options Analytics Dashboard")
 
 col1, col2 = st.columns([1, 1])
@@ -16,7 +59,7 @@ with col1:
 
 with col2:
     if ticker:
-        expirations = list_expirations(ticker)
+        expirations = list(snapshot_store.expirations(ticker)) if replay else list_expirations(ticker)
         selected_exp_str = st.selectbox("Choisis une date d'échéance", expirations)
     else:
         selected_exp_str = None
@@ -24,244 +67,397 @@ with col2:
 if selected_exp_str:
 
     if selected_exp_str:
-        chain = get_option_chain(ticker, selected_exp_str)
-        spot = float(yf.Ticker(ticker).history(period="1d")["Close"].iloc[-1])
-
-        if chain is not None:
-            calls = chain.calls.dropna(subset=["strike", "impliedVolatility", "lastPrice"])
-            puts = chain.puts.dropna(subset=["strike", "impliedVolatility", "lastPrice"])
-
-            iv_mean = calls["impliedVolatility"].mean()
-            atm_strike = calls.iloc[(calls['strike'] - spot).abs().argsort()].iloc[0]['strike']
-
-            col1, col2, col3, col4 = st.columns(4)
-            with col1:
-                with st.container(border=True):
-                    st.metric("\U0001F4C9 Spot", f"${spot:.2f}")
-            with col2:
-                with st.container(border=True):
-                    st.metric("\U0001F4CA IV moyenne (Calls)", f"{iv_mean:.2%}")
-            with col3:
-                with st.container(border=True):
-                    st.metric("\U0001F4CE Nombre de strikes", f"{len(chain.calls)}")
-            with col4:
-                with st.container(border=True):
-                    st.metric("\U0001F3AF Strike ATM", f"{atm_strike:.1f}")
-
-            st.subheader("Smile de Volatilité Implicite")
-            fig = plot_iv_smile(chain)
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Analyse automatique du smile
-            call_min, call_max = calls['impliedVolatility'].min(), calls['impliedVolatility'].max()
-            put_min, put_max = puts['impliedVolatility'].min(), puts['impliedVolatility'].max()
-
-            skew_call = "croissante (skew baissier)" if call_max > call_min else "décroissante (skew haussier)"
-            skew_put = "croissante (skew baissier)" if put_max > put_min else "décroissante (skew haussier)"
-
-            with st.expander("✨ Analyse automatique du Smile -  Click to open", expanded=False):
-                st.markdown("""
-                - Les **Calls** ont une vol. *{}*, allant de **{:.2%}** à **{:.2%}**.  
-                - Les **Puts** ont une vol. *{}*, allant de **{:.2%}** à **{:.2%}**.
-
-                > Cela suggère que le marché anticipe une {} pour les Calls,  
-                > et une {} pour les Puts. Ces asymétries peuvent révéler des biais directionnels dans les anticipations du marché.
-                """.format(
-                    skew_call, call_min, call_max,
-                    skew_put, put_min, put_max,
-                    "plus forte probabilité de décote violente (protection à la baisse demandée)" if "croissante" in skew_call else "anticipation modérée de hausse",
-                    "forte demande de protection contre les hausses" if "croissante" in skew_put else "biais baissier implicite"
-                ))
-
-            st.markdown("---")
-
-            colL, colR = st.columns(2)
-            with colL:
-                st.subheader("Heatmap des Prix d'Options Call")
-                fig_heatmap_call = plot_option_price_heatmap(calls, option_type='call')
-                st.plotly_chart(fig_heatmap_call, use_container_width=True)
-            with colR:
-                st.subheader("Heatmap des Prix d'Options Put")
-                fig_heatmap_put = plot_option_price_heatmap(puts, option_type='put')
-                st.plotly_chart(fig_heatmap_put, use_container_width=True)
-            
-            with st.expander("🔥 Analyse automatique - Click to open", expanded=False):
-                st.markdown(f"""
-                Les **heatmaps ci-dessus représentent la répartition des prix des options Call et Put** en fonction des strikes disponibles à l’échéance sélectionnée.
-
-                - On observe que **les primes Call les plus élevées** se concentrent sur les strikes autour de **{calls['strike'][calls['lastPrice'].idxmax()]:.0f}**, avec une prime maximale de **${calls['lastPrice'].max():.2f}**.
-                - Côté Put, le pic de prime est situé autour de **{puts['strike'][puts['lastPrice'].idxmax()]:.0f}**, avec un maximum de **${puts['lastPrice'].max():.2f}**.
-
-                Cela peut indiquer une **anticipation de mouvement important** ou une **forte demande de couverture** sur ces niveaux spécifiques.
-
-                - Les **Calls OTM (out-of-the-money)** sont moins demandés (primes faibles), sauf sur des strikes populaires (niveaux ronds ou tech).
-                - Les **Puts ITM** (in-the-money) montrent souvent une prime élevée, signalant une protection recherchée en cas de correction.
-
-                > **Conclusion :** Ces zones de concentration des primes peuvent refléter :
-                > - Des zones de **support/résistance implicites**.
-                > - Une **peur de forte variation du sous-jacent**.
-                > - Une opportunité pour structurer des stratégies comme le Strangle, le Straddle ou les Spreads.
-
-                Une analyse dynamique de ces cartes permet ainsi d’anticiper les points de tension ou d’intérêt du marché sur cette échéance.
-                """)
-
-            st.markdown("---")
-
-            st.subheader("Visualiseur de Payoff")
-
-            strategies = [
-                "Long Call", "Long Put", "Short Call", "Short Put",
-                "Bull Call Spread", "Strangle", "Covered Call",
-                "Bear Call Spread", "Bear Put Spread", "Bull Put Spread"
-            ]
-
-            strategy = st.selectbox("Strat\u00e9gie", strategies)
-            quantity = st.slider("Quantit\u00e9 de contrats", 1, 10, 1)
-            x = np.linspace(spot * 0.5, spot * 1.5, 200)
-            payoff = np.zeros_like(x)
-
-            def get_price(option_df, strike):
-                return option_df[option_df['strike'] == strike]['lastPrice'].values[0]
-
-            available_call_strikes = sorted(calls['strike'].unique())
-            available_put_strikes = sorted(puts['strike'].unique())
-
-            if strategy == "Bull Call Spread":
-                strike_long = st.select_slider("Strike Long Call", options=available_call_strikes, value=available_call_strikes[0])
-                strike_short = st.select_slider("Strike Short Call", options=available_call_strikes, value=available_call_strikes[-1])
-                premium_long = get_price(calls, strike_long)
-                premium_short = get_price(calls, strike_short)
-                premium = premium_long - premium_short
-                payoff = quantity * ((np.maximum(x - strike_long, 0) - premium_long) - (np.maximum(x - strike_short, 0) - premium_short))
-                breakeven = strike_long + premium
-
-            elif strategy == "Strangle":
-                strike_call = st.select_slider("Strike Call (achat)", options=available_call_strikes)
-                strike_put = st.select_slider("Strike Put (achat)", options=available_put_strikes)
-                premium_call = get_price(calls, strike_call)
-                premium_put = get_price(puts, strike_put)
-                premium = premium_call + premium_put
-                payoff = quantity * ((np.maximum(x - strike_call, 0) + np.maximum(strike_put - x, 0)) - premium)
-                breakeven = (strike_put - premium, strike_call + premium)
-
-            elif strategy == "Covered Call":
-                strike_call = st.select_slider("Strike Call (vente)", options=available_call_strikes)
-                premium = get_price(calls, strike_call)
-                payoff = quantity * ((x - spot) + (premium - np.maximum(x - strike_call, 0)))
-                breakeven = spot - premium
-
-            elif strategy == "Bear Call Spread":
-                strike_short = st.select_slider("Strike Call (vente)", options=available_call_strikes)
-                strike_long = st.select_slider("Strike Call (achat)", options=available_call_strikes)
-                premium_short = get_price(calls, strike_short)
-                premium_long = get_price(calls, strike_long)
-                premium = premium_short - premium_long
-                payoff = quantity * ((premium_short - np.maximum(x - strike_short, 0)) - (np.maximum(x - strike_long, 0) - premium_long))
-                breakeven = strike_short + premium
-
-            elif strategy == "Bear Put Spread":
-                strike_long = st.select_slider("Strike Put (achat)", options=available_put_strikes)
-                strike_short = st.select_slider("Strike Put (vente)", options=available_put_strikes)
-                premium_long = get_price(puts, strike_long)
-                premium_short = get_price(puts, strike_short)
-                premium = premium_long - premium_short
-                payoff = quantity * ((np.maximum(strike_long - x, 0) - premium_long) - (np.maximum(strike_short - x, 0) - premium_short))
-                breakeven = strike_long - premium
-
-            elif strategy == "Bull Put Spread":
-                strike_short = st.select_slider("Strike Put (vente)", options=available_put_strikes)
-                strike_long = st.select_slider("Strike Put (achat)", options=available_put_strikes)
-                premium_short = get_price(puts, strike_short)
-                premium_long = get_price(puts, strike_long)
-                premium = premium_short - premium_long
-                payoff = quantity * ((premium_short - np.maximum(strike_short - x, 0)) - (np.maximum(strike_long - x, 0) - premium_long))
-                breakeven = strike_short - premium
-
-            else:
-                strikes_df = calls if "Call" in strategy else puts
-                available_strikes = sorted(strikes_df['strike'].unique())
-                strike = st.select_slider("Strike", options=available_strikes, value=available_strikes[len(available_strikes)//2])
-                premium = get_price(strikes_df, strike)
-
-                if strategy == "Long Call":
-                    payoff = quantity * (np.maximum(x - strike, 0) - premium)
-                    breakeven = strike + premium
-                elif strategy == "Short Call":
-                    payoff = quantity * (premium - np.maximum(x - strike, 0))
-                    breakeven = strike + premium
-                elif strategy == "Long Put":
-                    payoff = quantity * (np.maximum(strike - x, 0) - premium)
-                    breakeven = strike - premium
-                elif strategy == "Short Put":
-                    payoff = quantity * (premium - np.maximum(strike - x, 0))
-                    breakeven = strike - premium
-
-            pnl_max = np.max(payoff)
-            pnl_min = np.min(payoff)
-
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(x=x, y=payoff, fill='tozeroy', mode='lines'))
-            fig.update_layout(title="Payoff \u00e0 l'\u00e9ch\u00e9ance", xaxis_title="Prix du sous-jacent", yaxis_title="Profit / Perte ($)")
-            st.plotly_chart(fig, use_container_width=True)
-
-            with st.expander("📊 Analyse automatique du Payoff - Click to open", expanded=False):
-                direction = "haussière" if "Call" in strategy or "Bull" in strategy else "baissière"
-                sens = "hausse" if "Call" in strategy or "Bull" in strategy else "baisse"
-                position = "acheteur" if "Long" in strategy else "vendeur"
-                risque_limité = "Oui" if "Long" in strategy or "Spread" in strategy else "Non"
-                gain_limité = "Oui" if "Spread" in strategy or "Short" in strategy else "Non"
-
-                # Ligne strike dynamique
-                if strategy in ["Long Call", "Short Call", "Long Put", "Short Put"]:
-                    ligne_strike = f"- **Strike :** `${strike:.2f}` | **Prime payée :** `${premium:.2f}`"
-                elif strategy == "Strangle":
-                    ligne_strike = f"- **Strikes :** Call = `${strike_call:.2f}`, Put = `${strike_put:.2f}` | **Prime totale :** `${premium:.2f}`"
-                elif strategy == "Covered Call":
-                    ligne_strike = f"- **Strike du Call vendu :** `${strike_call:.2f}` | **Prime reçue :** `${premium:.2f}`"
-                elif strategy == "Bull Call Spread":
-                    ligne_strike = f"- **Strikes :** Long = `${strike_long:.2f}`, Short = `${strike_short:.2f}` | **Prime nette :** `${premium:.2f}`"
-                elif strategy == "Bear Call Spread":
-                    ligne_strike = f"- **Strikes :** Short = `${strike_short:.2f}`, Long = `${strike_long:.2f}` | **Prime nette :** `${premium:.2f}`"
-                elif strategy == "Bear Put Spread":
-                    ligne_strike = f"- **Strikes :** Long = `${strike_long:.2f}`, Short = `${strike_short:.2f}` | **Prime nette :** `${premium:.2f}`"
-                elif strategy == "Bull Put Spread":
-                    ligne_strike = f"- **Strikes :** Short = `${strike_short:.2f}`, Long = `${strike_long:.2f}` | **Prime nette :** `${premium:.2f}`"
-                else:
-                    ligne_strike = ""
-
-                st.markdown(f"""
-                - **Stratégie sélectionnée :** `{strategy}` sur {quantity} contrat(s)  
-                - **Direction anticipée :** `{direction}` (profite d'une {sens} du sous-jacent)  
-                {ligne_strike}  
-                - **Seuil de rentabilité (break-even) :** `{breakeven}`
-
-                **Analyse du profil de risque :**
-
-                - **Perte maximale :** `${pnl_min:.2f}`  
-                - **Gain potentiel max :** `${pnl_max:.2f}`  
-                - **Risque limité ?** `{risque_limité}` | **Gain limité ?** `{gain_limité}`
-
-                > 👉 Cette stratégie est adaptée si tu anticipes une **forte {sens}** d'ici l’échéance.  
-                > Le payoff est **{('illimité' if pnl_max > 1e5 else 'limité')}** tandis que la perte est **{('limitée à la prime' if pnl_min < 0 else 'potentiellement élevée')}**.  
-                > Le break-even te donne un repère : en dessous, tu perds, au-dessus, tu gagnes.
-                """)
-
-            colA, colB, colC, colD = st.columns(4)
-            with colA:
-                with st.container(border=True):
-                    if isinstance(breakeven, tuple):
-                        st.metric("\U0001F3AF Break-even", f"${breakeven[0]:.2f} / ${breakeven[1]:.2f}")
-                    else:
-                        st.metric("\U0001F3AF Break-even", f"${breakeven:.2f}")
-            with colB:
-                with st.container(border=True):
-                    st.metric("\U0001F4B0 PnL Max", f"${pnl_max:.2f}")
-            with colC:
-                with st.container(border=True):
-                    st.metric("\U0001F53B PnL Min", f"${pnl_min:.2f}")
-            with colD:
-                with st.container(border=True):
-                    st.metric("\U0001F4B5 Prime r\u00e9elle", f"${premium:.2f}")
+        replay_at = None
+        surface_cache = None
+        if replay:
+            # Le dashboard est rejoué à partir des snapshots archivés, sans appel réseau
+            times = snapshot_store.snapshot_times(ticker, selected_exp_str)
+            if not times:
+                st.info(f"Aucun snapshot archivé pour {ticker} {selected_exp_str}.")
+                st.stop()
+            replay_at = st.sidebar.select_slider(
+                "Instant rejoué", options=times, value=times[-1],
+                format_func=lambda ts: ts.tz_convert("America/New_York").strftime("%Y-%m-%d %H:%M:%S"),
+            )
+            replay_provider = ReplayProvider(snapshot_store, at=replay_at)
+            surface_cache = MarketDataCache(provider=replay_provider)
+            chain, spot = snapshot_store.load_snapshot(ticker, selected_exp_str, replay_at)
+            if spot is None:
+                # Chaîne archivée sans spot : on reprend celui d'une autre échéance au même instant
+                try:
+                    spot = replay_provider.spot(ticker)
+                except LookupError:
+                    st.info(f"Aucun spot archivé pour {ticker} à cet instant.")
+                    st.stop()
+        else:
+            # Spot d'abord : l'archive de snapshots l'associe à la chaîne fetchée juste après
+            spot = get_spot(ticker)
+            chain = get_option_chain(ticker, selected_exp_str)
+
+        if chain is not None and spot is not None:
+            T = time_to_expiry(selected_exp_str, now=replay_at)
+
+            col_iv, col_rate = st.columns([2, 1])
+            with col_iv:
+                iv_source = st.radio("Source de l'IV", ["Yahoo", "Recalculée (Black-Scholes)"], horizontal=True)
+            with col_rate:
+                rate = st.number_input("Taux sans risque", value=0.04, step=0.005, format="%.3f")
+
+            # L'état dérivé (IV, grecques, heatmaps) survit aux reruns : seuls les contrats modifiés sont recalculés
+            live_key = (ticker, selected_exp_str, iv_source, rate, replay_at)
+            if st.session_state.get("live_key") != live_key:
+                st.session_state["live_key"] = live_key
+                st.session_state["live_chain"] = LiveChain(solve_iv=iv_source != "Yahoo")
+            live_chain = st.session_state["live_chain"]
+
+            def refresh_market():
+                # En live, chaque fragment relit la chaîne au rythme du tick (cache partagé, max_age)
+                # et ne recalcule que les contrats modifiés ; sinon le diff est vide et rien n'est refait
+                if not live:
+                    return spot, live_chain.update(chain, spot, T, rate)
+                tick_spot = get_spot(ticker, max_age=refresh_every) or spot
+                tick_chain = get_option_chain(ticker, selected_exp_str, max_age=refresh_every) or chain
+                return tick_spot, live_chain.update(tick_chain, tick_spot, time_to_expiry(selected_exp_str), rate)
+
+            def live_fragment(fn):
+                # En live, seul le fragment est relancé à chaque tick ; le reste de la page ne bouge pas
+                return st.fragment(fn, run_every=refresh_every if live else None)
+
+            @live_fragment
+            def metrics_panel():
+                spot, changes = refresh_market()
+                if live:
+                    st.caption(f"🔴 Live · {time.strftime('%H:%M:%S')} · {changes['call']} call(s) et {changes['put']} put(s) mis à jour")
+                if iv_source != "Yahoo":
+                    not_converged = live_chain.calls.n_unconverged + live_chain.puts.n_unconverged
+                    st.caption(f"IV recalculée depuis les prix mid/last : {not_converged} contrat(s) sans convergence, exclus des graphiques.")
+
+                calls = live_chain.calls.view()
+                iv_mean = live_chain.calls.iv_mean()
+                atm_strike = calls.atm_strike(spot)
+
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    with st.container(border=True):
+                        st.metric("\U0001F4C9 Spot", f"${spot:.2f}")
+                with col2:
+                    with st.container(border=True):
+                        st.metric("\U0001F4CA IV moyenne (Calls)", f"{iv_mean:.2%}")
+                with col3:
+                    with st.container(border=True):
+                        st.metric("\U0001F4CE Nombre de strikes", f"{live_chain.calls.n_contracts}")
+                with col4:
+                    with st.container(border=True):
+                        st.metric("\U0001F3AF Strike ATM", f"{atm_strike:.1f}")
+
+                return spot
+
+            spot = metrics_panel()
+            calls = live_chain.calls.view()
+            puts = live_chain.puts.view()
+            atm_strike = calls.atm_strike(spot)
+
+            # Onglets paresseux : seul l'onglet ouvert est calculé, les autres ne coûtent rien au rerun
+            tab_smile, tab_heatmaps, tab_greeks, tab_term, tab_exposure, tab_payoff = st.tabs(
+                ["Smile", "Heatmaps", "Grecques", "Structure par terme", "Exposition (GEX)", "Payoff & Monte Carlo"],
+                key="section",
+                on_change="rerun",
+            )
+
+            if tab_smile.open:
+                with tab_smile:
+                    @live_fragment
+                    def smile_panel():
+                        refresh_market()
+                        calls = live_chain.calls.view()
+                        puts = live_chain.puts.view()
+
+                        st.subheader("Smile de Volatilité Implicite")
+                        show_chart(live_chain.smile_figure(), "iv_smile")
+
+                        # Analyse automatique du smile
+                        call_min, call_max = calls['impliedVolatility'].min(), calls['impliedVolatility'].max()
+                        put_min, put_max = puts['impliedVolatility'].min(), puts['impliedVolatility'].max()
+
+                        skew_call = "croissante (skew baissier)" if call_max > call_min else "décroissante (skew haussier)"
+                        skew_put = "croissante (skew baissier)" if put_max > put_min else "décroissante (skew haussier)"
+
+                        with st.expander("✨ Analyse automatique du Smile -  Click to open", expanded=False):
+                            st.markdown("""
+                            - Les **Calls** ont une vol. *{}*, allant de **{:.2%}** à **{:.2%}**.  
+                            - Les **Puts** ont une vol. *{}*, allant de **{:.2%}** à **{:.2%}**.
+
+                            > Cela suggère que le marché anticipe une {} pour les Calls,  
+                            > et une {} pour les Puts. Ces asymétries peuvent révéler des biais directionnels dans les anticipations du marché.
+                            """.format(
+                                skew_call, call_min, call_max,
+                                skew_put, put_min, put_max,
+                                "plus forte probabilité de décote violente (protection à la baisse demandée)" if "croissante" in skew_call else "anticipation modérée de hausse",
+                                "forte demande de protection contre les hausses" if "croissante" in skew_put else "biais baissier implicite"
+                            ))
+
+                    smile_panel()
+
+            if tab_heatmaps.open:
+                with tab_heatmaps:
+                    @live_fragment
+                    def heatmap_panel():
+                        refresh_market()
+                        calls = live_chain.calls.view()
+                        puts = live_chain.puts.view()
+
+                        colL, colR = st.columns(2)
+                        with colL:
+                            st.subheader("Heatmap des Prix d'Options Call")
+                            show_chart(live_chain.calls.heatmap_figure(), "heatmap_call")
+                        with colR:
+                            st.subheader("Heatmap des Prix d'Options Put")
+                            show_chart(live_chain.puts.heatmap_figure(), "heatmap_put")
+
+                        with st.expander("🔥 Analyse automatique - Click to open", expanded=False):
+                            st.markdown(f"""
+                            Les **heatmaps ci-dessus représentent la répartition des prix des options Call et Put** en fonction des strikes disponibles à l’échéance sélectionnée.
+
+                            - On observe que **les primes Call les plus élevées** se concentrent sur les strikes autour de **{calls['strike'][calls['lastPrice'].argmax()]:.0f}**, avec une prime maximale de **${calls['lastPrice'].max():.2f}**.
+                            - Côté Put, le pic de prime est situé autour de **{puts['strike'][puts['lastPrice'].argmax()]:.0f}**, avec un maximum de **${puts['lastPrice'].max():.2f}**.
+
+                            Cela peut indiquer une **anticipation de mouvement important** ou une **forte demande de couverture** sur ces niveaux spécifiques.
+
+                            - Les **Calls OTM (out-of-the-money)** sont moins demandés (primes faibles), sauf sur des strikes populaires (niveaux ronds ou tech).
+                            - Les **Puts ITM** (in-the-money) montrent souvent une prime élevée, signalant une protection recherchée en cas de correction.
+
+                            > **Conclusion :** Ces zones de concentration des primes peuvent refléter :
+                            > - Des zones de **support/résistance implicites**.
+                            > - Une **peur de forte variation du sous-jacent**.
+                            > - Une opportunité pour structurer des stratégies comme le Strangle, le Straddle ou les Spreads.
+
+                            Une analyse dynamique de ces cartes permet ainsi d’anticiper les points de tension ou d’intérêt du marché sur cette échéance.
+                            """)
+
+                    heatmap_panel()
+
+            if tab_greeks.open:
+                with tab_greeks:
+                    col_ex, col_q, col_steps = st.columns([2, 1, 1])
+                    with col_ex:
+                        exercise = st.radio("Exercice", list(EXERCISE_MODELS), index=1, horizontal=True, key="exercise", persist_state="session")
+                    model = EXERCISE_MODELS[exercise]
+                    with col_q:
+                        dividend_yield = st.number_input("Rendement du dividende", value=0.0, step=0.005, format="%.3f",
+                                                         disabled=model is None, key="dividend_yield", persist_state="session")
+                    with col_steps:
+                        steps = st.select_slider("Pas de l'arbre", options=[51, 101, 201, 501], value=201,
+                                                 disabled=model in (None, "baw"), key="tree_steps", persist_state="session")
+
+                    def greeks_frame(side):
+                        if model is None:
+                            return side.greeks_frame()
+                        return side.american_frame(*live_chain.market, dividend_yield, model, steps)
+
+                    @live_fragment
+                    def greeks_panel():
+                        refresh_market()
+                        colG1, colG2 = st.columns(2)
+                        with colG1:
+                            st.subheader("Grecques des Calls")
+                            st.dataframe(greeks_frame(live_chain.calls), hide_index=True, use_container_width=True)
+                        with colG2:
+                            st.subheader("Grecques des Puts")
+                            st.dataframe(greeks_frame(live_chain.puts), hide_index=True, use_container_width=True)
+
+                    greeks_panel()
+
+            if tab_term.open:
+                with tab_term:
+                    st.subheader("Structure par Terme de la Volatilité")
+                    progress = st.progress(0.0)
+                    term_chart = st.empty()
+                    atm_iv = {}
+                    surface_frames = []
+
+                    # Chaque échéance est affichée dès son arrivée, sans attendre la surface complète
+                    for i, (exp, surface_df, error) in enumerate(iter_option_surface(ticker, expirations, cache=surface_cache), start=1):
+                        progress.progress(i / len(expirations), text=f"{i}/{len(expirations)} échéances chargées")
+                        if error is not None:
+                            st.warning(f"Échéance {exp} indisponible : {error}")
+                            continue
+                        surface_frames.append(surface_df)
+                        surface_df = surface_df.dropna(subset=["strike", "impliedVolatility"])
+                        surface_df = surface_df[surface_df["impliedVolatility"] > 0]
+                        if surface_df.empty:
+                            continue
+                        nearest = (surface_df["strike"] - spot).abs()
+                        atm_iv[exp] = surface_df.loc[nearest == nearest.min(), "impliedVolatility"].mean()
+                        show_chart(plot_term_structure(pd.Series(atm_iv).sort_index()), "term_structure", term_chart)
+
+                    if surface_frames:
+                        try:
+                            vol_surface = get_vol_surface(
+                                ticker, pd.concat(surface_frames, ignore_index=True), spot, rate, now=replay_at
+                            )
+                        except ValueError as e:
+                            st.warning(f"Surface de volatilité indisponible : {e}")
+                        else:
+                            show_chart(plot_vol_surface(*vol_surface.grid()), "vol_surface")
+
+            if tab_exposure.open:
+                with tab_exposure:
+                    st.subheader("Exposition des Dealers (GEX)")
+
+                    @live_fragment
+                    def exposure_panel():
+                        # Les chaînes passent par le cache partagé (TTL normal) : en live, seul le calcul suit le tick
+                        surface = load_option_surface(ticker, expirations, cache=surface_cache)
+                        if surface.empty:
+                            st.warning("Aucune échéance disponible pour calculer l'exposition.")
+                            return
+                        exposure_spot = (get_spot(ticker, max_age=refresh_every) or spot) if live else spot
+                        exposure = get_exposure(ticker, surface, exposure_spot, rate, now=replay_at)
+                        totals = exposure.totals
+
+                        colE1, colE2, colE3, colE4 = st.columns(4)
+                        with colE1:
+                            with st.container(border=True):
+                                st.metric("\U0001F300 GEX totale (1 %)", f"${totals['gamma'] / 1e6:,.1f}M")
+                        with colE2:
+                            with st.container(border=True):
+                                st.metric("\U0001F4C8 DEX totale", f"${totals['delta'] / 1e9:,.2f}B")
+                        with colE3:
+                            with st.container(border=True):
+                                st.metric("\U0001F30A Vanna (1 pt de vol)", f"${totals['vanna'] / 1e6:,.1f}M")
+                        with colE4:
+                            with st.container(border=True):
+                                flip = exposure.gamma_flip
+                                st.metric("\U0001F6A9 Gamma flip", "Hors plage" if flip is None else f"${flip:.2f}")
+
+                        show_chart(plot_gamma_exposure(exposure.by_strike, exposure.profile, exposure_spot, exposure.gamma_flip), "gamma_exposure")
+                        st.caption(
+                            f"{totals['contracts']} contrats avec open interest sur {surface['expiry'].nunique()} échéances. "
+                            "Convention : dealers acheteurs des calls, vendeurs des puts."
+                        )
+
+                    exposure_panel()
+
+            if tab_payoff.open:
+                with tab_payoff:
+                    st.subheader("Visualiseur de Payoff")
+
+                    # persist_state : les réglages survivent quand l'onglet est fermé (ses widgets ne sont plus rendus)
+                    strategy = st.selectbox("Stratégie", list(STRATEGY_TEMPLATES), key="strategy", persist_state="session")
+                    quantity = st.slider("Quantité de contrats", 1, 10, 1, key="quantity", persist_state="session")
+
+                    option_chains = {'call': calls, 'put': puts}
+
+                    legs = []
+                    leg_vols = []
+                    for kind, side, qty, label, default in STRATEGY_TEMPLATES[strategy]:
+                        if kind == 'stock':
+                            legs.append(Leg('stock', spot, side, qty, 0.0))
+                            leg_vols.append(0.0)
+                            continue
+                        options = option_chains[kind].strikes.tolist()
+                        strike = st.select_slider(label, options=options, value=options[int(default * (len(options) - 1))], key=f"{strategy}-{label}", persist_state="session")
+                        legs.append(Leg(kind, strike, side, qty, option_chains[kind].get(strike)))
+                        leg_vols.append(option_chains[kind].get(strike, "impliedVolatility"))
+
+                    with stage("app.payoff"):
+                        summary = strategy_summary(legs, quantity)
+                        breakeven = summary["breakevens"]
+                        pnl_max, pnl_min = summary["pnl_max"], summary["pnl_min"]
+                        premium = summary["net_premium"]
+
+                        # Les strikes sont ajoutés à la grille pour tracer les points de cassure exactement
+                        x = np.union1d(np.linspace(spot * 0.5, spot * 1.5, 200), [leg.strike for leg in legs])
+                        x = x[(x >= spot * 0.5) & (x <= spot * 1.5)]
+                        payoff = strategy_payoff(legs, x, quantity)
+
+                    show_chart(plot_strategy_payoff(x, payoff), "payoff")
+
+                    def format_pnl(value):
+                        return "Illimité" if np.isinf(value) else f"${value:.2f}"
+
+                    breakeven_str = " / ".join(f"${b:.2f}" for b in breakeven) or "Aucun"
+
+                    with st.expander("📊 Analyse automatique du Payoff - Click to open", expanded=False):
+                        direction = "haussière" if "Call" in strategy or "Bull" in strategy else "baissière"
+                        sens = "hausse" if "Call" in strategy or "Bull" in strategy else "baisse"
+                        risque_limité = "Oui" if not np.isinf(pnl_min) else "Non"
+                        gain_limité = "Oui" if not np.isinf(pnl_max) else "Non"
+
+                        # Ligne strike dynamique
+                        ligne_strike = "- **Jambes :** " + ", ".join(
+                            f"{'Long' if leg.side > 0 else 'Short'} {leg.qty}x {leg.kind.capitalize()} `${leg.strike:.2f}`"
+                            + (f" @ `${leg.premium:.2f}`" if leg.kind != 'stock' else "")
+                            for leg in legs
+                        ) + f" | **Prime nette :** `${premium:.2f}`"
+
+                        st.markdown(f"""
+                        - **Stratégie sélectionnée :** `{strategy}` sur {quantity} contrat(s)  
+                        - **Direction anticipée :** `{direction}` (profite d'une {sens} du sous-jacent)  
+                        {ligne_strike}  
+                        - **Seuil de rentabilité (break-even) :** `{breakeven_str}`
+
+                        **Analyse du profil de risque :**
+
+                        - **Perte maximale :** `{format_pnl(pnl_min)}`  
+                        - **Gain potentiel max :** `{format_pnl(pnl_max)}`  
+                        - **Risque limité ?** `{risque_limité}` | **Gain limité ?** `{gain_limité}`
+
+                        > 👉 Cette stratégie est adaptée si tu anticipes une **forte {sens}** d'ici l’échéance.  
+                        > Le payoff est **{('illimité' if np.isinf(pnl_max) else 'limité')}** tandis que la perte est **{('potentiellement illimitée' if np.isinf(pnl_min) else 'limitée')}**.  
+                        > Le break-even te donne un repère : en dessous, tu perds, au-dessus, tu gagnes.
+                        """)
+
+                    colA, colB, colC, colD = st.columns(4)
+                    with colA:
+                        with st.container(border=True):
+                            st.metric("\U0001F3AF Break-even", breakeven_str)
+                    with colB:
+                        with st.container(border=True):
+                            st.metric("\U0001F4B0 PnL Max", format_pnl(pnl_max))
+                    with colC:
+                        with st.container(border=True):
+                            st.metric("\U0001F53B PnL Min", format_pnl(pnl_min))
+                    with colD:
+                        with st.container(border=True):
+                            st.metric("\U0001F4B5 Prime nette", f"${premium:.2f}")
+
+                    st.subheader("Simulation Monte Carlo du P&L")
+
+                    colS1, colS2, colS3 = st.columns(3)
+                    with colS1:
+                        n_paths = st.select_slider("Nombre de trajectoires", options=[10_000, 100_000, 1_000_000], value=100_000, key="mc_paths", persist_state="session")
+                    with colS2:
+                        # Yahoo renvoie souvent 0, 1e-5 ou NaN : la valeur par défaut doit respecter min_value
+                        atm_iv = float(calls.get(atm_strike, "impliedVolatility"))
+                        sim_vol = st.number_input("Volatilité simulée", value=max(atm_iv, 0.01) if np.isfinite(atm_iv) else 0.25,
+                                                  min_value=0.01, step=0.01, format="%.3f")
+                    with colS3:
+                        use_jumps = st.checkbox("Sauts de Merton (1/an, -5% ± 10%)", value=False, key="mc_jumps", persist_state="session")
+
+                    mc_key = (ticker, selected_exp_str, tuple(legs), float(spot), rate, sim_vol, n_paths, use_jumps, quantity)
+                    if st.button("Lancer la simulation"):
+                        try:
+                            result = simulate_strategy(
+                                legs, spot, T, rate, sim_vol,
+                                horizons=T * np.array([0.25, 0.5, 0.75, 1.0]),
+                                n_paths=n_paths,
+                                jump=JumpParams(1.0, -0.05, 0.10) if use_jumps else None,
+                                leg_vols=leg_vols,
+                                quantity=quantity,
+                                seed=42,
+                            )
+                        except ValueError as e:
+                            st.warning(f"Simulation impossible : {e}")
+                        else:
+                            # Gardée en session : changer d'onglet ne relance pas la simulation
+                            st.session_state["mc_result"] = (mc_key, result)
+
+                    mc_result = st.session_state.get("mc_result")
+                    if mc_result is not None and mc_result[0] == mc_key:
+                        st.dataframe(mc_result[1].summary, hide_index=True, use_container_width=True)
+                        show_chart(plot_pnl_distribution(mc_result[1].pnl[-1]), "pnl_distribution")
+
 
 st.markdown("---")
 st.markdown(
@@ -273,4 +469,27 @@ st.markdown(
     </div>
     """,
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+rerun_timer.stop()
+
+if profiler.enabled:
+    with st.sidebar:
+        st.subheader("Coût du dernier rerun")
+        last_rerun = profiler.summary(since=rerun_started, session=session_id)
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "Étape": name,
+                    "Appels": total["calls"],
+                    "Temps (ms)": total["wall"] * 1e3,
+                    "Mémoire (Ko)": total["allocated"] / 1024,
+                }
+                for name, total in last_rerun.items()
+            ]).sort_values("Temps (ms)", ascending=False),
+            hide_index=True,
+        )
+        st.caption("Cache marché (hits / misses)")
+        st.json(get_cache().stats(), expanded=False)
+        st.download_button("Export JSON", profiler.to_json(indent=2, session=session_id), file_name="profiling.json", mime="application/json")
+        st.download_button("Export Prometheus", profiler.to_prometheus(), file_name="profiling.prom", mime="text/plain")
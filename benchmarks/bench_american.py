@@ -0,0 +1,99 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_american
+#
+# Moteur américain face au moteur européen (Black-Scholes) :
+#   - précision : écart au prix de référence (Leisen-Reimer à --ref-steps pas) sur un sous-échantillon
+#   - débit : prix d'une chaîne entière par BS, BAW et les arbres CRR / LR, avec ou sans pool de processus
+#   - inversion de l'IV et grecques par différences finies sur la même chaîne
+import argparse
+import os
+import time
+
+import numpy as np
+
+from utils.american import american_greeks, american_iv, american_price
+from utils.greeks import bs_greeks, bs_price, implied_volatility
+
+
+def make_chain(n, spot=100.0, r=0.03, seed=0):
+    rng = np.random.default_rng(seed)
+    K = spot * rng.uniform(0.6, 1.4, n)
+    T = rng.uniform(7, 720, n) / 365
+    sigma = rng.uniform(0.08, 1.0, n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    return K, T, sigma, option_type
+
+
+def best_of(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def engines(steps, workers):
+    # (nom, fonction de prix) ; le prix européen avec dividende se ramène à BS sur S·e^(-qT)
+    yield "Black-Scholes", lambda S, K, T, r, s, kind, q: bs_price(S * np.exp(-q * T), K, T, r, s, kind)
+    yield "BAW", lambda S, K, T, r, s, kind, q: american_price(S, K, T, r, s, kind, q, "baw")
+    for n in steps:
+        for method in ("crr", "lr"):
+            for w in workers:
+                label = f"{method.upper()} {n} pas" + (f" ({w} proc.)" if w > 1 else "")
+                yield label, (lambda n, method, w: lambda S, K, T, r, s, kind, q:
+                              american_price(S, K, T, r, s, kind, q, method, n, w))(n, method, w)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing américain (BAW, arbres CRR/LR) contre Black-Scholes")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--steps", type=int, nargs="+", default=[51, 201, 501])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--dividend", type=float, default=0.02, help="rendement du dividende continu q")
+    parser.add_argument("--ref-steps", type=int, default=2001)
+    parser.add_argument("--ref-size", type=int, default=500, help="contrats du sous-échantillon de précision")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    spot, r, q = 100.0, 0.03, args.dividend
+
+    K, T, sigma, kind = make_chain(args.ref_size, spot, r, seed=1)
+    reference = american_price(spot, K, T, r, sigma, kind, q, "lr", args.ref_steps)
+    puts = kind == 'put'
+    print(f"Précision sur {args.ref_size} contrats (q={q:.1%}), référence LR {args.ref_steps} pas")
+    print(f"{'moteur':<26} {'err. moy.':>10} {'err. max':>10} {'err. max puts':>14}")
+    for name, price in engines(args.steps, [1]):
+        err = np.abs(price(spot, K, T, r, sigma, kind, q) - reference)
+        print(f"{name:<26} {err.mean():>10.4f} {err.max():>10.4f} {err[puts].max():>14.4f}")
+
+    for n in args.sizes:
+        K, T, sigma, kind = make_chain(n, spot, r)
+        print(f"\nDébit sur {n} contrats")
+        print(f"{'moteur':<26} {'durée (ms)':>11} {'contrats/s':>12} {'x BS':>8}")
+        base = None
+        for name, price in engines(args.steps, args.workers):
+            seconds, _ = best_of(lambda: price(spot, K, T, r, sigma, kind, q), args.repeat)
+            base = base or seconds
+            print(f"{name:<26} {seconds * 1e3:>11.1f} {n / seconds:>12,.0f} {seconds / base:>8.1f}")
+
+        print(f"\n{'IV et grecques':<26} {'durée (ms)':>11} {'convergés':>10} {'err. max IV':>12}")
+        cases = [("Black-Scholes", None, None), ("BAW", "baw", None)]
+        cases += [(f"LR {s} pas", "lr", s) for s in args.steps if s <= 201]
+        for name, model, steps in cases:
+            if model is None:
+                quotes = bs_price(spot * np.exp(-q * T), K, T, r, sigma, kind)
+                solve = lambda: implied_volatility(quotes, spot * np.exp(-q * T), K, T, r, kind)
+                greeks = lambda: bs_greeks(spot * np.exp(-q * T), K, T, r, sigma, kind)
+            else:
+                quotes = american_price(spot, K, T, r, sigma, kind, q, model, steps)
+                solve = lambda: american_iv(quotes, spot, K, T, r, kind, q, model, steps)
+                greeks = lambda: american_greeks(spot, K, T, r, sigma, kind, q, model, steps)
+            seconds, (iv, converged) = best_of(solve, 1)
+            err = np.abs(iv - sigma)[converged].max() if converged.any() else float("nan")
+            print(f"{name + ' (IV)':<26} {seconds * 1e3:>11.1f} {converged.mean():>10.2%} {err:>12.2e}")
+            seconds, _ = best_of(greeks, 1)
+            print(f"{name + ' (grecques)':<26} {seconds * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_greeks
+import argparse
+import time
+from math import log, sqrt, exp
+
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+
+from utils.visuals import compute_greeks
+
+
+def legacy_compute_greeks(df, S, T, r):
+    # Ancienne implémentation ligne par ligne, conservée comme référence
+    result = []
+
+    for _, row in df.dropna(subset=['strike', 'impliedVolatility']).iterrows():
+        K = row['strike']
+        sigma = row['impliedVolatility']
+        if sigma == 0:
+            continue
+        d1 = (log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt(T))
+        d2 = d1 - sigma * sqrt(T)
+
+        delta = norm.cdf(d1)
+        gamma = norm.pdf(d1) / (S * sigma * sqrt(T))
+        vega = S * norm.pdf(d1) * sqrt(T) / 100
+        theta = (-S * norm.pdf(d1) * sigma / (2 * sqrt(T)) - r * K * exp(-r * T) * norm.cdf(d2)) / 365
+        rho = K * T * exp(-r * T) * norm.cdf(d2) / 100
+
+        result.append({
+            "Strike": K,
+            "IV": sigma,
+            "Delta": delta,
+            "Gamma": gamma,
+            "Vega": vega,
+            "Theta": theta,
+            "Rho": rho
+        })
+
+    return pd.DataFrame(result)
+
+
+def make_chain(n, spot=100.0, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = np.linspace(spot * 0.5, spot * 1.5, n)
+    iv = 0.2 + 0.3 * ((strikes / spot) - 1.0) ** 2 + rng.normal(0, 0.01, n)
+    return pd.DataFrame({"strike": strikes, "impliedVolatility": np.clip(iv, 0.01, None)})
+
+
+def timeit(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compute_greeks vectorisé vs boucle iterrows")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    S, T, r = 100.0, 0.25, 0.02
+    print(f"{'contrats':>10} {'boucle (ms)':>12} {'vectorisé (ms)':>15} {'speedup':>8}")
+    for n in args.sizes:
+        df = make_chain(n)
+        fast = compute_greeks(df, S, T, r)
+        slow = legacy_compute_greeks(df, S, T, r)
+        np.testing.assert_allclose(fast.to_numpy(), slow.to_numpy(), rtol=1e-9, atol=1e-12)
+
+        t_slow = timeit(lambda: legacy_compute_greeks(df, S, T, r), args.repeat)
+        t_fast = timeit(lambda: compute_greeks(df, S, T, r), args.repeat)
+        print(f"{n:>10} {t_slow * 1e3:>12.2f} {t_fast * 1e3:>15.3f} {t_slow / t_fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_iv
+import argparse
+import time
+
+import numpy as np
+
+from utils.greeks import bs_price, implied_volatility
+
+
+def make_surface(n, spot=100.0, r=0.03, seed=0):
+    rng = np.random.default_rng(seed)
+    K = spot * rng.uniform(0.6, 1.4, n)
+    T = rng.uniform(7, 720, n) / 365
+    sigma = rng.uniform(0.08, 1.0, n)
+    option_type = np.where(rng.random(n) < 0.5, 'call', 'put')
+    price = bs_price(spot, K, T, r, sigma, option_type)
+    return price, K, T, sigma, option_type
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inversion de l'IV en batch (Newton + bissection)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    spot, r = 100.0, 0.03
+    print(f"{'contrats':>10} {'durée (ms)':>11} {'convergés':>10} {'err. max IV':>12}")
+    for n in args.sizes:
+        price, K, T, sigma, option_type = make_surface(n, spot, r)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            iv, converged = implied_volatility(price, spot, K, T, r, option_type)
+            best = min(best, time.perf_counter() - start)
+        err = np.abs(iv - sigma)[converged].max()
+        print(f"{n:>10} {best * 1e3:>11.2f} {converged.mean():>10.2%} {err:>12.2e}")
+
+
+if __name__ == "__main__":
+    main()
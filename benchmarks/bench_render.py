@@ -0,0 +1,66 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_render
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from utils import visuals
+from utils.visuals import plot_option_price_heatmap
+
+
+def legacy_option_price_heatmap(df, option_type='call'):
+    # Ancienne version : pivot sur les valeurs brutes d'IV
+    df = df.dropna(subset=['impliedVolatility', 'strike', 'lastPrice'])
+    heatmap_data = df.pivot_table(index='impliedVolatility', columns='strike', values='lastPrice')
+    heatmap_data = heatmap_data.sort_index(ascending=True)
+
+    return px.imshow(
+        heatmap_data.values,
+        labels=dict(x='Strike', y='Implied Volatility', color='Prix'),
+        x=heatmap_data.columns,
+        y=np.round(heatmap_data.index, 2),
+        aspect='auto',
+        title=f'Heatmap des Prix {option_type.capitalize()} (Strike vs IV)'
+    )
+
+
+def make_chain(n, spot=5000.0, seed=0):
+    rng = np.random.default_rng(seed)
+    strikes = np.round(np.linspace(spot * 0.5, spot * 1.5, n), 1)
+    iv = 0.15 + 0.4 * (strikes / spot - 1.0) ** 2 + rng.normal(0, 0.005, n)
+    price = np.maximum(spot - strikes, 0) + spot * iv * 0.05
+    return pd.DataFrame({"strike": strikes, "impliedVolatility": iv, "lastPrice": price})
+
+
+def measure(fn, df):
+    start = time.perf_counter()
+    fig = fn(df)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    payload = fig.to_json()
+    serialize = time.perf_counter() - start
+    return build, serialize, len(payload)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Heatmap pivot brut vs grille binnée + cache de figures")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 1_000, 3_000])
+    args = parser.parse_args()
+
+    print(f"{'contrats':>9} {'version':>9} {'build (ms)':>11} {'json (ms)':>10} {'payload (Ko)':>13}")
+    for n in args.sizes:
+        df = make_chain(n)
+        visuals._figure_cache.clear()
+        rows = [
+            ("pivot", measure(legacy_option_price_heatmap, df)),
+            ("binnée", measure(plot_option_price_heatmap, df)),
+            ("cache", measure(plot_option_price_heatmap, df)),
+        ]
+        for name, (build, serialize, size) in rows:
+            print(f"{n:>9} {name:>9} {build * 1e3:>11.2f} {serialize * 1e3:>10.2f} {size / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
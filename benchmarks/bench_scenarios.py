@@ -0,0 +1,47 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_scenarios
+import argparse
+import os
+import time
+
+from utils.greeks import bs_price
+from utils.scenarios import JumpParams, simulate_strategy
+from utils.strategies import Leg
+
+
+def iron_condor(spot, T, r, sigma):
+    strikes = [("put", 1, 0.85), ("put", -1, 0.95), ("call", -1, 1.05), ("call", 1, 1.15)]
+    return [
+        Leg(kind, spot * m, side, 1, float(bs_price(spot, spot * m, T, r, sigma, kind)))
+        for kind, side, m in strikes
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Débit du moteur Monte Carlo (trajectoires/s)")
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    parser.add_argument("--horizons", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--jumps", action="store_true")
+    args = parser.parse_args()
+
+    spot, T, r, sigma = 100.0, 0.25, 0.03, 0.25
+    legs = iron_condor(spot, T, r, sigma)
+    horizons = [T * (i + 1) / args.horizons for i in range(args.horizons)]
+    jump = JumpParams(1.0, -0.05, 0.10) if args.jumps else None
+
+    print(f"{args.paths} trajectoires, {args.horizons} horizons, iron condor, sauts={'oui' if jump else 'non'}")
+    print(f"{'workers':>8} {'durée (s)':>10} {'traj./s':>12} {'P(profit)':>10}")
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = simulate_strategy(
+            legs, spot, T, r, sigma, horizons=horizons, n_paths=args.paths,
+            chunk_size=args.chunk, seed=0, jump=jump, n_workers=workers,
+        )
+        elapsed = time.perf_counter() - start
+        pop = result.summary["Prob. de profit"].iloc[-1]
+        print(f"{workers:>8} {elapsed:>10.2f} {args.paths / elapsed:>12,.0f} {pop:>10.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_startup
+#
+# Coût d'un démarrage à froid, tel que le voit un conteneur fraîchement lancé :
+# chaque mesure tourne dans un interpréteur neuf (pas de modules déjà importés).
+#   - imports : temps d'import de chaque module, et modules lourds chargés au passage
+#   - premier rendu : premier run complet de app.py (AppTest, chaîne synthétique), puis un rerun
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["streamlit", "utils.yf_data", "utils.greeks", "utils.visuals", "utils.surface",
+           "utils.exposure", "utils.live", "utils.snapshots", "utils.scenarios"]
+# Modules que le démarrage ne doit plus payer : importés à la demande
+LAZY = ["yfinance", "scipy.optimize", "scipy.stats", "plotly.express"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+PAINT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from benchmarks.synthetic import SyntheticProvider
+from utils import yf_data
+yf_data.configure_cache(provider=SyntheticProvider({n_contracts}, {n_expiries}))
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+first = time.perf_counter() - start
+assert not at.exception, at.exception
+start = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - start
+print(json.dumps({{"first_paint": first, "rerun": rerun, "loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def run_fresh(script):
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": ROOT},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import et de premier rendu, interpréteur neuf à chaque mesure")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--contracts", type=int, default=2_000)
+    parser.add_argument("--expiries", type=int, default=10)
+    parser.add_argument("--output", help="écrit le rapport JSON dans ce fichier")
+    args = parser.parse_args()
+
+    report = {"imports": {}, "first_paint": None}
+    print(f"{'module':<22} {'import (ms)':>12}  modules lourds chargés")
+    for module in MODULES:
+        runs = [run_fresh(IMPORT_SCRIPT.format(module=module, lazy=LAZY)) for _ in range(args.repeat)]
+        seconds = statistics.median(r["seconds"] for r in runs)
+        report["imports"][module] = {"median_ms": seconds * 1e3, "loaded": runs[0]["loaded"]}
+        print(f"{module:<22} {seconds * 1e3:>12.1f}  {', '.join(runs[0]['loaded']) or '-'}")
+
+    script = PAINT_SCRIPT.format(n_contracts=args.contracts, n_expiries=args.expiries, lazy=LAZY)
+    runs = [run_fresh(script) for _ in range(args.repeat)]
+    first = statistics.median(r["first_paint"] for r in runs)
+    rerun = statistics.median(r["rerun"] for r in runs)
+    report["first_paint"] = {"first_ms": first * 1e3, "rerun_ms": rerun * 1e3, "loaded": runs[0]["loaded"]}
+    print(f"\npremier rendu : {first * 1e3:.0f} ms, rerun : {rerun * 1e3:.0f} ms "
+          f"(modules lourds chargés : {', '.join(runs[0]['loaded']) or 'aucun'})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
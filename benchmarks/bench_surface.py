@@ -0,0 +1,35 @@
+# Lancer depuis la racine du repo : python -m benchmarks.bench_surface
+import argparse
+import time
+
+from benchmarks.synthetic import SyntheticProvider
+from utils.yf_data import MarketDataCache, load_option_surface
+
+
+def run(n_expiries, n_strikes, latency, max_workers):
+    provider = SyntheticProvider(2 * n_strikes * n_expiries, n_expiries, latency=latency)
+    # Génère les chaînes avant le chronomètre : seul le chargement est mesuré
+    provider.expirations("FAKE")
+    cache = MarketDataCache(provider=provider)
+    start = time.perf_counter()
+    surface = load_option_surface("FAKE", cache=cache, max_workers=max_workers)
+    return time.perf_counter() - start, len(surface)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chargement séquentiel vs parallèle de toutes les échéances")
+    parser.add_argument("--expiries", type=int, default=20)
+    parser.add_argument("--strikes", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="latence simulée par échéance (s)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    print(f"{args.expiries} échéances x {args.strikes} strikes, latence {args.latency * 1e3:.0f} ms")
+    print(f"{'workers':>8} {'durée (s)':>10} {'contrats':>9}")
+    for workers in args.workers:
+        elapsed, rows = run(args.expiries, args.strikes, args.latency, workers)
+        print(f"{workers:>8} {elapsed:>10.2f} {rows:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# Suite de benchmarks hors ligne, sur chaînes synthétiques déterministes.
+#
+#   python -m benchmarks.run                          # tailles par défaut, rapport console
+#   python -m benchmarks.run --sizes 50x1 50000x40    # contrats x échéances
+#   python -m benchmarks.run --save-baseline          # met à jour benchmarks/baseline.json
+#   python -m benchmarks.run --check                  # compare à la baseline, code 1 si régression
+#
+# La baseline n'a de sens que sur la machine qui l'a produite : la regénérer sur
+# la machine de référence avant de s'en servir pour détecter des régressions.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import NOW, RATE, START, SyntheticProvider, make_option_chain
+from utils import visuals
+from utils.american import american_price
+from utils.chain import as_strike_chain
+from utils.exposure import compute_exposure
+from utils.greeks import implied_volatility, option_mid, time_to_expiry
+from utils.live import LiveChain
+from utils.snapshots import SnapshotStore
+from utils.strategies import Leg, pnl_extrema, strategy_payoff, strategy_summary
+from utils.surface import VolSurface
+from utils.visuals import compute_greeks, plot_option_price_heatmap
+from utils.yf_data import MarketDataCache, chain_to_long, load_option_surface
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_SIZES = ["50x1", "2000x10", "50000x40"]
+SPOT = 100.0
+
+
+def _surface(chains):
+    return pd.concat([chain_to_long(_indexed(c), exp) for exp, c in chains.items()], ignore_index=True)
+
+
+def _indexed(chain):
+    return chain._replace(calls=as_strike_chain(chain.calls), puts=as_strike_chain(chain.puts))
+
+
+def _sides(chains):
+    # Chaque côté de chaque échéance, avec sa maturité : tous les contrats de la surface
+    for exp, chain in chains.items():
+        T = time_to_expiry(exp, NOW)
+        chain = _indexed(chain)
+        yield chain.calls, 'call', T
+        yield chain.puts, 'put', T
+
+
+def case_greeks(chains):
+    sides = list(_sides(chains))
+    return lambda: [compute_greeks(side, SPOT, T, RATE, option_type) for side, option_type, T in sides]
+
+
+def case_heatmap(chains):
+    sides = list(_sides(chains))
+
+    def run():
+        # Sans le cache de figures : on mesure la construction
+        visuals._figure_cache.clear()
+        for side, option_type, _ in sides:
+            plot_option_price_heatmap(side, option_type=option_type)
+    return run
+
+
+def case_payoff(chains):
+    # Un iron condor par échéance, et autant de combinaisons à 4 strikes que de contrats
+    # dans la surface pour le scanner de P&L extrêmes
+    surface = _surface(chains)
+    strikes = np.unique(surface["strike"].to_numpy())
+    rng = np.random.default_rng(0)
+    combos = np.sort(rng.choice(strikes, size=(len(surface), 4)), axis=1)
+    premiums = np.ones_like(combos)
+    weights = np.array([1.0, -1.0, -1.0, 1.0])
+    is_call = np.array([False, False, True, True])
+    prices = np.linspace(SPOT * 0.5, SPOT * 1.5, 200)
+    bands = []
+    for chain in chains.values():
+        calls = as_strike_chain(chain.calls)
+        atm = calls.nearest_index(SPOT)
+        bands.append(calls.strikes[max(atm - 10, 0):atm + 10])
+
+    def run():
+        for band in bands:
+            legs = [Leg('put', band[0], 1), Leg('put', band[len(band) // 3], -1),
+                    Leg('call', band[2 * len(band) // 3], -1), Leg('call', band[-1], 1)]
+            strategy_summary(legs)
+            strategy_payoff(legs, prices)
+        pnl_extrema(combos, weights, premiums, is_call, np.zeros(4, dtype=bool))
+    return run
+
+
+def case_iv_solver(chains):
+    surface = _surface(chains)
+    T = np.array([time_to_expiry(exp, NOW) for exp in surface["expiry"]])
+    price = option_mid(surface)
+    K = surface["strike"].to_numpy()
+    option_type = surface["type"].to_numpy()
+    return lambda: implied_volatility(price, SPOT, K, T, RATE, option_type)
+
+
+def case_chain_load(chains):
+    n_contracts = sum(len(c.calls) + len(c.puts) for c in chains.values())
+    provider = SyntheticProvider(n_contracts, len(chains), SPOT, start=START)
+    provider.expirations("SYN")
+
+    def run():
+        # Cache froid à chaque fois : indexation + concaténation de la surface complète
+        load_option_surface("SYN", cache=MarketDataCache(provider=provider), max_workers=8)
+    return run
+
+
+def case_surface_fit(chains):
+    surface = _surface(chains)
+    return lambda: VolSurface.fit(surface, SPOT, RATE, now=NOW)
+
+
+def case_snapshot_replay(chains):
+    # Relecture memory-map de la surface archivée (un snapshot par échéance)
+    store = SnapshotStore(tempfile.mkdtemp(prefix="bench-snapshots-"))
+    for exp, chain in chains.items():
+        store.append("SYN", exp, _indexed(chain), SPOT)
+    return lambda: [store.load_snapshot("SYN", exp) for exp in chains]
+
+
+def case_live_tick(chains):
+    # Un tick live où 1 % des contrats ont été recotés : diff + recalcul partiel
+    chain = _indexed(next(iter(chains.values())))
+    calls = chain.calls
+    moved = np.arange(0, len(calls), 100)
+    last = calls["lastPrice"].copy()
+    last[moved] *= 1.01
+    ticks = [chain, chain._replace(calls=calls.assign(lastPrice=last))]
+    live = LiveChain(solve_iv=True)
+    live.update(ticks[0], SPOT, 30 / 365, RATE)
+    state = {"i": 0}
+
+    def run():
+        state["i"] += 1
+        live.update(ticks[state["i"] % 2], SPOT, 30 / 365, RATE)
+    return run
+
+
+def case_exposure(chains):
+    surface = _surface(chains)
+    return lambda: compute_exposure(surface, SPOT, RATE, now=NOW)
+
+
+def case_american(chains):
+    # Surface complète sous exercice américain (BAW), à comparer au cas iv_solver / compute_greeks
+    surface = _surface(chains)
+    T = np.array([time_to_expiry(exp, NOW) for exp in surface["expiry"]])
+    K = surface["strike"].to_numpy()
+    sigma = surface["impliedVolatility"].to_numpy(dtype=np.float64, na_value=np.nan)
+    option_type = surface["type"].to_numpy()
+    return lambda: american_price(SPOT, K, T, RATE, sigma, option_type, model="baw")
+
+
+CASES = {
+    "compute_greeks": case_greeks,
+    "price_heatmap": case_heatmap,
+    "payoff": case_payoff,
+    "iv_solver": case_iv_solver,
+    "chain_load": case_chain_load,
+    "surface_fit": case_surface_fit,
+    "snapshot_replay": case_snapshot_replay,
+    "live_tick": case_live_tick,
+    "exposure": case_exposure,
+    "american": case_american,
+}
+
+
+def measure(fn, repeat):
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(timings) * 1e3,
+        "best_ms": min(timings) * 1e3,
+        "peak_kb": peak / 1024,
+    }
+
+
+def parse_size(text):
+    contracts, _, expiries = text.lower().partition("x")
+    return int(contracts), int(expiries or 1)
+
+
+def run_suite(sizes, cases, repeat):
+    results = {}
+    for size in sizes:
+        n_contracts, n_expiries = parse_size(size)
+        chains = make_option_chain(n_contracts, n_expiries, SPOT, seed=0, start=START)
+        for name in cases:
+            key = f"{name}@{size}"
+            results[key] = measure(CASES[name](chains), repeat)
+            r = results[key]
+            print(f"{key:<28} {r['median_ms']:>10.2f} ms {r['best_ms']:>10.2f} ms {r['peak_kb']:>12.0f} Ko", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, r in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = r["median_ms"] / base["median_ms"] if base["median_ms"] > 0 else 1.0
+        flag = "RÉGRESSION" if ratio > threshold else ""
+        print(f"{key:<28} {base['median_ms']:>10.2f} -> {r['median_ms']:>10.2f} ms  x{ratio:.2f} {flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks hors ligne sur chaînes synthétiques")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="contrats x échéances, ex: 2000x10")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="écrit le rapport JSON dans ce fichier")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="compare à la baseline")
+    parser.add_argument("--threshold", type=float, default=1.3, help="ratio médiane/baseline toléré")
+    args = parser.parse_args(argv)
+
+    print(f"{'cas@taille':<28} {'médiane':>13} {'meilleur':>13} {'pic mémoire':>15}")
+    results = run_suite(args.sizes, args.cases, args.repeat)
+    report = {
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "numpy": np.__version__},
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({**report, "results": dict(sorted(baseline.items()))}, f, indent=2)
+        print(f"Baseline mise à jour : {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"Pas de baseline : {args.baseline}", file=sys.stderr)
+            return 2
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de x{args.threshold}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from utils.greeks import bs_price
+from utils.yf_data import OptionChain
+
+RATE = 0.04
+# Date de départ et horloge figées pour les benchmarks : mêmes échéances, mêmes maturités
+# et donc mêmes entrées d'un jour à l'autre, comparables à la baseline
+START = pd.Timestamp("2025-01-06")
+NOW = pd.Timestamp("2025-01-06 09:30", tz="America/New_York")
+
+
+def _expiry_days(n_expiries):
+    # Hebdomadaires puis mensuelles, comme une chaîne d'indice : 7, 14, 21, 28, 56, 84...
+    weekly = [7 * (i + 1) for i in range(min(n_expiries, 4))]
+    monthly = [28 * (i + 2) for i in range(max(n_expiries - 4, 0))]
+    return weekly + monthly
+
+
+def make_side(option_type, strikes, spot, days, exp, rng):
+    n = len(strikes)
+    T = days / 365
+    k = np.log(strikes / spot)
+    iv = 0.2 - 0.1 * k + 0.3 * k ** 2 + 0.02 * np.sqrt(T) + rng.normal(0, 0.005, n)
+    iv = np.clip(iv, 0.03, None)
+
+    price = bs_price(spot, strikes, T, RATE, iv, option_type)
+    spread = 0.02 * price + 0.05
+    bid = np.maximum(price - spread / 2, 0.0)
+    ask = price + spread / 2
+    last = np.maximum(price * (1 + rng.normal(0, 0.01, n)), 0.01)
+
+    # Quelques strikes illiquides comme chez Yahoo : IV quasi nulle, pas de volume
+    illiquid = rng.random(n) < 0.02
+    iv = np.where(illiquid, 1e-5, iv)
+    activity = np.exp(-8 * k ** 2)
+    volume = rng.poisson(500 * activity).astype(float)
+    volume[rng.random(n) < 0.05] = np.nan
+    open_interest = rng.poisson(3000 * activity).astype(float)
+
+    letter = "C" if option_type == "call" else "P"
+    expiry_code = exp.replace("-", "")[2:]
+    now = pd.Timestamp("2024-01-02 15:30", tz="UTC")
+    return pd.DataFrame({
+        "contractSymbol": [f"SYN{expiry_code}{letter}{int(round(K * 1000)):08d}" for K in strikes],
+        "lastTradeDate": now - pd.to_timedelta(rng.integers(0, 3600, n), unit="s"),
+        "strike": strikes,
+        "lastPrice": np.round(last, 2),
+        "bid": np.round(bid, 2),
+        "ask": np.round(ask, 2),
+        "change": np.round(rng.normal(0, 0.1, n), 2),
+        "percentChange": np.round(rng.normal(0, 2.0, n), 2),
+        "volume": volume,
+        "openInterest": open_interest,
+        "impliedVolatility": iv,
+        "inTheMoney": strikes < spot if option_type == "call" else strikes > spot,
+        "contractSize": "REGULAR",
+        "currency": "USD",
+    })
+
+
+def make_option_chain(n_contracts=2_000, n_expiries=1, spot=100.0, seed=0, ticker="SYN", start=None):
+    # Chaîne déterministe au schéma yfinance : n_contracts au total, répartis sur
+    # n_expiries échéances, moitié calls / moitié puts. Renvoie {échéance: OptionChain}.
+    start = pd.Timestamp.today().normalize() if start is None else pd.Timestamp(start)
+    n_strikes = max(n_contracts // (2 * n_expiries), 1)
+    strikes = np.round(np.linspace(spot * 0.5, spot * 1.5, n_strikes), 2)
+
+    chains = {}
+    for i, days in enumerate(_expiry_days(n_expiries)):
+        exp = str((start + pd.Timedelta(days=days)).date())
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode()), i])
+        calls = make_side("call", strikes, spot, days, exp, rng)
+        puts = make_side("put", strikes, spot, days, exp, rng)
+        chains[exp] = OptionChain(calls, puts, None)
+    return chains
+
+
+class SyntheticProvider:
+    # Remplace yfinance hors ligne (même interface que YFinanceProvider), avec latence simulée
+
+    def __init__(self, n_contracts=2_000, n_expiries=10, spot=100.0, latency=0.0, seed=0, start=None):
+        self.n_contracts = n_contracts
+        self.n_expiries = n_expiries
+        self.spot_price = spot
+        self.latency = latency
+        self.seed = seed
+        self.start = start
+        self._chains = {}
+
+    def _ticker_chains(self, ticker):
+        if ticker not in self._chains:
+            self._chains[ticker] = make_option_chain(
+                self.n_contracts, self.n_expiries, self.spot_price, self.seed, ticker, self.start
+            )
+        return self._chains[ticker]
+
+    def expirations(self, ticker):
+        return tuple(self._ticker_chains(ticker))
+
+    def option_chain(self, ticker, exp):
+        time.sleep(self.latency)
+        return self._ticker_chains(ticker)[exp]
+
+    def spot(self, ticker):
+        return self.spot_price
+
+    def history(self, ticker, period="1y"):
+        rng = np.random.default_rng([self.seed, zlib.crc32(ticker.encode())])
+        returns = rng.normal(0, 0.015, 252)
+        closes = self.spot_price * np.exp(returns.cumsum() - returns.sum())
+        index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=252, name="date")
+        return pd.DataFrame({"close": closes}, index=index)
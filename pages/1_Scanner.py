@@ -0,0 +1,41 @@
+import pandas as pd
+import streamlit as st
+
+from utils.scanner import SCAN_COLUMNS, iter_scan, normalize_tickers
+
+st.set_page_config(page_title="Scanner d'Options", layout="wide")
+st.title("🔎 Scanner Multi-Tickers")
+
+watchlist = st.text_area("Watchlist (séparée par des virgules, espaces ou retours à la ligne)", value="AAPL, MSFT, NVDA, TSLA, AMZN, SPY, QQQ")
+tickers = normalize_tickers(watchlist.replace(",", " ").split())
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    target_days = st.number_input("Maturité cible (jours)", min_value=1, max_value=730, value=30)
+with col2:
+    rate = st.number_input("Taux sans risque", value=0.04, step=0.005, format="%.3f")
+with col3:
+    max_workers = st.slider("Requêtes parallèles", 1, 32, 8)
+
+if st.button(f"Scanner {len(tickers)} ticker(s)", disabled=not tickers):
+    progress = st.progress(0.0)
+    table = st.empty()
+    rows, errors = [], []
+
+    # Le tableau est rafraîchi à chaque ticker terminé, sans attendre la fin du scan
+    for i, row in enumerate(iter_scan(tickers, target_days, rate, max_workers=max_workers), start=1):
+        progress.progress(i / len(tickers), text=f"{i}/{len(tickers)} : {row['ticker']}")
+        if row.get("error"):
+            errors.append(row)
+            continue
+        rows.append(row)
+        results = pd.DataFrame(rows, columns=list(SCAN_COLUMNS)).drop(columns="error")
+        table.dataframe(results.sort_values("atm_iv", ascending=False), hide_index=True, use_container_width=True)
+
+    if errors:
+        with st.expander(f"⚠️ {len(errors)} ticker(s) en erreur"):
+            st.dataframe(pd.DataFrame(errors)[["ticker", "error"]], hide_index=True)
+
+    if rows:
+        results = pd.DataFrame(rows, columns=list(SCAN_COLUMNS)).drop(columns="error")
+        st.download_button("Télécharger (CSV)", results.to_csv(index=False), file_name="scan.csv", mime="text/csv")
@@ -0,0 +1,43 @@
+# Prix américains : BAW contre les tables de Haug et contre l'arbre de Leisen-Reimer
+import numpy as np
+import pytest
+
+from utils.american import american_price, baw_price, tree_price
+from utils.greeks import bs_price
+
+SPOTS = np.array([90.0, 100.0, 110.0])
+
+# Haug, The Complete Guide to Option Pricing Formulas (2007), approximation BAW :
+# K = 100, r = 0.10, b = 0 (q = r), spots 90 / 100 / 110
+HAUG_BAW = [
+    (0.10, 0.15, [0.0206, 1.8771, 10.0089], [10.0000, 1.8770, 0.0410]),
+    (0.10, 0.25, [0.3159, 3.1280, 10.3919], [10.2533, 3.1277, 0.4562]),
+    (0.10, 0.35, [0.9495, 4.3777, 11.1679], [10.8787, 4.3777, 1.2402]),
+    (0.50, 0.15, [0.8208, 4.0842, 10.8087], [10.5595, 4.0842, 1.0822]),
+    (0.50, 0.25, [2.7437, 6.8015, 13.0170], [12.4419, 6.8014, 3.3226]),
+    (0.50, 0.35, [5.0063, 9.5106, 15.5689], [14.6945, 9.5104, 5.8823]),
+]
+
+
+@pytest.mark.parametrize("T, sigma, calls, puts", HAUG_BAW)
+def test_baw_matches_haug_table(T, sigma, calls, puts):
+    np.testing.assert_allclose(baw_price(SPOTS, 100.0, T, 0.10, sigma, 'call', q=0.10), calls, atol=5e-3)
+    np.testing.assert_allclose(baw_price(SPOTS, 100.0, T, 0.10, sigma, 'put', q=0.10), puts, atol=5e-3)
+
+
+@pytest.mark.parametrize("args, q", [
+    ((50.0, 50.0, 5 / 12, 0.10, 0.40, 'put'), 0.0),
+    ((100.0, 100.0, 0.25, 0.08, 0.20, 'call'), 0.12),
+])
+def test_baw_scalar_and_array_agree_with_tree(args, q):
+    S, K, T, r, sigma, kind = args
+    scalar = american_price(S, K, T, r, sigma, kind, q, "baw")
+    array = american_price([S], [K], T, r, sigma, kind, q, "baw")
+    tree = tree_price(S, K, T, r, sigma, kind, q, steps=1001, method="lr")
+
+    assert np.shape(scalar) == ()
+    assert float(scalar) == pytest.approx(array[0], abs=1e-12)
+    assert float(scalar) == pytest.approx(float(tree), abs=1e-2)
+    # La prime d'exercice anticipé est bien conservée : strictement au-dessus de l'européen
+    european = bs_price(S * np.exp(-q * T), K, T, r, sigma, kind)
+    assert float(scalar) > float(european) + 0.05
@@ -0,0 +1,41 @@
+# Mode live : les grecques américaines incrémentales valent un recalcul complet
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import START, SyntheticProvider
+from utils.american import compute_american_greeks
+from utils.chain import as_strike_chain
+from utils.live import LiveSide
+
+S, T, R, Q = 100.0, 0.25, 0.03, 0.01
+
+
+@pytest.fixture
+def calls():
+    provider = SyntheticProvider(spot=S, n_contracts=80, n_expiries=1, start=START)
+    exp = provider.expirations("SYN")[0]
+    return provider.option_chain("SYN", exp).calls.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("solve_iv", [False, True])
+def test_incremental_american_frame_matches_full_recompute(calls, solve_iv, monkeypatch):
+    side = LiveSide("call", solve_iv)
+    side.update(calls, S, T, R)
+    side.american_frame(S, T, R, Q, "lr", 51)
+
+    # Tick : trois contrats recotés, un retiré, un sans dernier prix
+    calls = calls.copy()
+    calls.loc[[3, 10, 20], ["lastPrice", "bid", "ask", "impliedVolatility"]] *= 1.02
+    calls.loc[30, "lastPrice"] = np.nan
+    calls = calls.drop(index=5).reset_index(drop=True)
+    side.update(calls, S, T, R)
+
+    priced = []
+    monkeypatch.setattr("utils.live.compute_american_greeks",
+                        lambda chain, *args: priced.append(len(chain)) or compute_american_greeks(chain, *args))
+    frame = side.american_frame(S, T, R, Q, "lr", 51)
+
+    assert priced == [3]
+    expected = compute_american_greeks(as_strike_chain(calls).valid("lastPrice"), S, T, R, "call", Q, "lr", 51, solve_iv)
+    assert list(frame.columns) == list(expected.columns)
+    np.testing.assert_allclose(frame.to_numpy(), expected.to_numpy(), equal_nan=True)
@@ -0,0 +1,153 @@
+# Comportement de MarketDataCache hors ligne : fournisseur stub et horloge injectée
+import sys
+import time
+
+import pytest
+
+from benchmarks.synthetic import SyntheticProvider
+from utils.yf_data import MarketDataCache
+
+
+class CountingProvider(SyntheticProvider):
+    # Chaîne synthétique, avec le nombre d'appels réseau par type de donnée
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = {"expirations": 0, "chain": 0, "spot": 0}
+
+    def expirations(self, ticker):
+        self.calls["expirations"] += 1
+        return super().expirations(ticker)
+
+    def option_chain(self, ticker, exp):
+        self.calls["chain"] += 1
+        return super().option_chain(ticker, exp)
+
+    def spot(self, ticker):
+        self.calls["spot"] += 1
+        return super().spot(ticker)
+
+
+class FailingProvider:
+    def option_chain(self, ticker, exp):
+        raise AssertionError("le réseau ne doit pas être appelé")
+
+    def spot(self, ticker):
+        raise AssertionError("le réseau ne doit pas être appelé")
+
+
+class Clock:
+    def __init__(self, now=None):
+        self.now = time.time() if now is None else now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def provider():
+    return CountingProvider(n_contracts=40, n_expiries=2)
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def test_ttl_hit_then_expiry(provider, clock):
+    cache = MarketDataCache(provider=provider, ttl={"spot": 15.0}, clock=clock)
+    cache.spot("SYN")
+    clock.now += 14.0
+    cache.spot("SYN")
+    assert provider.calls["spot"] == 1
+
+    clock.now += 1.0
+    cache.spot("SYN")
+    assert provider.calls["spot"] == 2
+    assert cache.stats()["kinds"]["spot"] == {"hits": 1, "misses": 2, "disk_hits": 0}
+
+
+def test_max_age_tightens_ttl_for_one_call(provider, clock):
+    cache = MarketDataCache(provider=provider, ttl={"chain": 60.0}, clock=clock)
+    exp = cache.expirations("SYN")[0]
+    cache.option_chain("SYN", exp)
+    clock.now += 5.0
+
+    cache.option_chain("SYN", exp, max_age=10.0)
+    assert provider.calls["chain"] == 1
+    cache.option_chain("SYN", exp, max_age=2.0)
+    assert provider.calls["chain"] == 2
+    # max_age ne peut qu'écourter le TTL, jamais l'allonger
+    clock.now += 61.0
+    cache.option_chain("SYN", exp, max_age=3600.0)
+    assert provider.calls["chain"] == 3
+
+
+def test_lru_eviction_by_size(clock):
+    provider = CountingProvider(n_contracts=40, n_expiries=3)
+    probe = MarketDataCache(provider=provider, clock=clock)
+    exps = probe.expirations("SYN")
+    size = probe.stats()["bytes"]
+    probe.option_chain("SYN", exps[0])
+    chain_size = probe.stats()["bytes"] - size
+
+    # Place pour deux chaînes seulement
+    cache = MarketDataCache(provider=provider, max_bytes=int(2.5 * chain_size), clock=clock)
+    cache.option_chain("SYN", exps[0])
+    cache.option_chain("SYN", exps[1])
+    cache.option_chain("SYN", exps[0])  # exps[1] devient le moins récemment utilisé
+    cache.option_chain("SYN", exps[2])
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    provider.calls["chain"] = 0
+    cache.option_chain("SYN", exps[0])
+    assert provider.calls["chain"] == 0
+    cache.option_chain("SYN", exps[1])
+    assert provider.calls["chain"] == 1
+
+
+@pytest.mark.parametrize("disk_format", ["parquet", "feather"])
+def test_disk_fallback_after_restart(provider, clock, tmp_path, disk_format):
+    pytest.importorskip("pyarrow")
+    warm = MarketDataCache(provider=provider, disk_dir=str(tmp_path), disk_format=disk_format, clock=clock)
+    exp = warm.expirations("SYN")[0]
+    chain = warm.option_chain("SYN", exp)
+    warm.spot("SYN")
+
+    # Nouveau process : mémoire vide, le snapshot disque encore frais évite le réseau
+    restarted = MarketDataCache(provider=FailingProvider(), disk_dir=str(tmp_path), disk_format=disk_format, clock=clock)
+    reloaded = restarted.option_chain("SYN", exp)
+    assert restarted.spot("SYN") == provider.spot_price
+    assert list(reloaded.calls.strikes) == list(chain.calls.strikes)
+    assert list(reloaded.puts["lastPrice"]) == list(chain.puts["lastPrice"])
+    assert restarted.stats()["kinds"]["chain"]["disk_hits"] == 1
+
+    # Snapshot plus vieux que le TTL : ignoré, on repasse par le fournisseur
+    clock.now += restarted.ttl["chain"] + 1
+    stale = MarketDataCache(provider=provider, disk_dir=str(tmp_path), disk_format=disk_format, clock=clock)
+    before = provider.calls["chain"]
+    stale.option_chain("SYN", exp)
+    assert provider.calls["chain"] == before + 1
+
+
+def test_failing_on_fetch_hook_keeps_value_cached(provider, clock):
+    def hook(kind, key, value):
+        raise RuntimeError("archive indisponible")
+
+    cache = MarketDataCache(provider=provider, clock=clock, on_fetch=hook)
+    with pytest.raises(RuntimeError):
+        cache.spot("SYN")
+    assert cache.spot("SYN") == provider.spot_price
+    assert provider.calls["spot"] == 1
+
+
+def test_chain_size_counts_object_columns(provider, clock):
+    cache = MarketDataCache(provider=provider, clock=clock)
+    exp = cache.expirations("SYN")[0]
+    before = cache.stats()["bytes"]
+    chain = cache.option_chain("SYN", exp)
+    strings = sum(
+        sys.getsizeof(v) for side in (chain.calls, chain.puts) for name in side.columns
+        if side[name].dtype == object for v in side[name]
+    )
+    assert cache.stats()["bytes"] - before >= strings
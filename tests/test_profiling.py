@@ -0,0 +1,40 @@
+# Profiling par session : une session activée ne profile ni les autres sessions ni les threads hors Streamlit
+import pytest
+
+import utils.profiling
+from utils.profiling import Profiler
+
+
+@pytest.fixture
+def session(monkeypatch):
+    current = {"id": None}
+    monkeypatch.setattr(utils.profiling, "current_session", lambda: current["id"])
+    return current
+
+
+def test_enable_scopes_profiling_to_one_session(session):
+    profiler = Profiler()
+    profiler.enable("a")
+
+    session["id"] = "a"
+    assert profiler.enabled
+    session["id"] = "b"
+    assert not profiler.enabled
+    # Thread sans contexte de script (prefetch, benchmarks)
+    session["id"] = None
+    assert not profiler.enabled
+
+    profiler.disable("a")
+    session["id"] = "a"
+    assert not profiler.enabled
+
+
+def test_enable_without_session_requires_always(session):
+    profiler = Profiler()
+    with pytest.raises(ValueError):
+        profiler.enable()
+    profiler.disable()
+    assert not profiler.enabled
+
+    profiler.always = True
+    assert profiler.enabled
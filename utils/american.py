@@ -0,0 +1,327 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from utils.chain import as_strike_chain
+from utils.greeks import _is_call, _norm_pdf, bs_price, implied_volatility, option_mid
+from utils.profiling import profiled
+
+MODELS = ("baw", "crr", "lr")
+DEFAULT_STEPS = 201
+# Contrats par chunk de l'arbre : deux tableaux (steps + 1, chunk) float64, ~0,8 Mo chacun à 201 pas
+TREE_CHUNK_SIZE = 512
+# Pas des différences finies : spot relatif, vol et taux absolus, théta sur un jour
+BUMP_SPOT = 1e-2
+BUMP_VOL = 1e-3
+BUMP_RATE = 1e-4
+BUMP_DAY = 1 / 365
+
+
+def _inputs(S, K, T, r, sigma, q, option_type):
+    S, K, T, r, sigma, q = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (S, K, T, r, sigma, q))
+    )
+    is_call = np.broadcast_to(_is_call(option_type), S.shape)
+    return S, K, T, r, sigma, q, is_call
+
+
+def _european(S, K, T, r, b, sigma, sign):
+    # Black-Scholes généralisé (coût de portage b = r - q), arguments déjà validés
+    vol_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (b + 0.5 * sigma * sigma) * T) / vol_t
+    carry = np.exp((b - r) * T)
+    price = sign * (S * carry * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * (d1 - vol_t)))
+    return price, d1, carry
+
+
+def _critical_price(K, T, r, b, sigma, sign, tol=1e-6, max_iter=100):
+    # Spot critique S* de Barone-Adesi-Whaley : Newton vectorisé (Haug, 2007),
+    # initialisé par l'approximation analytique de Bjerksund
+    sig2 = sigma * sigma
+    vol_t = sigma * np.sqrt(T)
+    m, n = 2 * r / sig2, 2 * b / sig2
+    k = 1.0 - np.exp(-r * T)
+    q_inf = (-(n - 1) + sign * np.sqrt((n - 1) ** 2 + 4 * m)) / 2
+    qi = (-(n - 1) + sign * np.sqrt((n - 1) ** 2 + 4 * m / k)) / 2
+    s_inf = K / (1 - 1 / q_inf)
+    h = -(b * T + sign * 2 * vol_t) * K / (s_inf - K)
+    # Point de départ entre K et S*(T infini) ; h > 0 seulement à vol quasi nulle
+    si = s_inf + (K - s_inf) * np.exp(np.minimum(h, 0.0))
+
+    active = np.arange(K.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        s, kk, t, rr, bb, sg, qa = si[active], K[active], T[active], r[active], b[active], sign[active], qi[active]
+        euro, d1, carry = _european(s, kk, t, rr, bb, sigma[active], sg)
+        nd1 = ndtr(sg * d1)
+        lhs = sg * (s - kk)
+        rhs = euro + sg * (1 - carry * nd1) * s / qa
+        slope = sg * carry * nd1 * (1 - 1 / qa) + sg * (1 - sg * carry * _norm_pdf(d1) / vol_t[active]) / qa
+        done = np.abs(lhs - rhs) / kk < tol
+        si[active] = np.where(done, s, (kk + sg * (rhs - slope * s)) / (1 - sg * slope))
+        active = active[~done]
+    return si, qi
+
+
+def baw_price(S, K, T, r, sigma, option_type='call', q=0.0):
+    # Approximation quadratique de Barone-Adesi-Whaley (1987), vectorisée.
+    # Sans exercice anticipé optimal (call sans dividende, put à taux <= 0) : prix européen.
+    S, K, T, r, sigma, q, is_call = _inputs(S, K, T, r, sigma, q, option_type)
+    valid = (sigma > 0) & (T > 0) & (S > 0) & (K > 0)
+    S_, K_, T_, sig = (np.where(valid, v, 1.0) for v in (S, K, T, sigma))
+    b = r - q
+    sign = np.where(is_call, 1.0, -1.0)
+
+    price, _, _ = _european(S_, K_, T_, r, b, sig, sign)
+    # Tableau propre (et au moins 1-D) : avec des scalaires, _european rend un np.float64
+    # et price.ravel() serait une copie temporaire
+    price = np.array(price, dtype=float, ndmin=1)
+    early = valid & np.where(is_call, b < r, r > 0)
+    idx = np.flatnonzero(early)
+    if idx.size:
+        s, k, t, rr, bb, sg, vol = (np.ravel(v)[idx] for v in (S_, K_, T_, r, b, sign, sig))
+        s_star, qi = _critical_price(k, t, rr, bb, vol, sg)
+        _, d1, carry = _european(s_star, k, t, rr, bb, vol, sg)
+        a = sg * (s_star / qi) * (1 - carry * ndtr(sg * d1))
+        with np.errstate(over='ignore'):
+            premium = np.ravel(price)[idx] + a * (s / s_star) ** qi
+        # Au-delà du spot critique, l'exercice immédiat est optimal
+        exercised = sg * (s - s_star) >= 0
+        price.reshape(-1)[idx] = np.where(exercised, sg * (s - k), premium)
+
+    return np.where(valid, price.reshape(S.shape), 0.0)
+
+
+def _tree_chunk(task):
+    # Induction arrière sur un chunk de contrats : valeurs (j + 1, n) au pas j
+    S, K, T, r, sigma, q, is_call, steps, method = task
+    b = r - q
+    if method == "lr":
+        # Leisen-Reimer : nombre de pas impair, probabilités par l'inversion de Peizer-Pratt
+        steps += 1 - steps % 2
+    dt = T / steps
+    growth = np.exp(b * dt)
+    u = np.exp(sigma * np.sqrt(dt))
+    d = 1 / u
+    # Vol très faible devant le portage (sigma·sqrt(dt) < |b|·dt) : p sort de [0, 1]
+    p = np.clip((growth - d) / (u - d), 0.0, 1.0)
+    if method == "lr":
+        vol_t = sigma * np.sqrt(T)
+        d1 = (np.log(S / K) + (b + 0.5 * sigma * sigma) * T) / vol_t
+
+        def peizer_pratt(z):
+            x = z / (steps + 1 / 3 + 0.1 / (steps + 1))
+            return 0.5 + np.sign(z) * np.sqrt(0.25 - 0.25 * np.exp(-x * x * (steps + 1 / 6)))
+
+        p_lr = peizer_pratt(d1 - vol_t)
+        # Strike à plusieurs dizaines d'écarts-types : p_lr vaut 0 ou 1, on garde les paramètres CRR
+        ok = (p_lr > 0) & (p_lr < 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            u_lr = growth * peizer_pratt(d1) / p_lr
+            d_lr = (growth - p_lr * u_lr) / (1 - p_lr)
+        u, d, p = np.where(ok, u_lr, u), np.where(ok, d_lr, d), np.where(ok, p_lr, p)
+
+    # Disposition (noeuds, contrats) : les tranches values[:j] restent contiguës,
+    # l'induction se fait en place sans allocation dans la boucle
+    disc_up = np.exp(-r * dt) * p
+    disc_down = np.exp(-r * dt) * (1 - p)
+    sign = np.where(is_call, 1.0, -1.0)
+    spot = S * d ** steps * (u / d) ** np.arange(steps + 1)[:, None]
+    values = np.maximum(sign * (spot - K), 0.0)
+    inv_d = 1 / d
+    buf = np.empty_like(values)
+    for j in range(steps, 0, -1):
+        v = values[:j]
+        up = np.multiply(disc_up, values[1:j + 1], out=buf[:j])
+        v *= disc_down
+        v += up
+        s = spot[:j]
+        s *= inv_d
+        exercise = np.subtract(s, K, out=buf[:j])
+        exercise *= sign
+        np.maximum(v, exercise, out=v)
+    return values[0]
+
+
+def tree_price(S, K, T, r, sigma, option_type='call', q=0.0, steps=DEFAULT_STEPS, method="lr",
+               chunk_size=TREE_CHUNK_SIZE, n_workers=None):
+    # Arbre binomial américain en batch (CRR ou Leisen-Reimer), par chunks de contrats ;
+    # n_workers > 1 répartit les chunks sur un pool de processus comme le Monte Carlo
+    if method not in ("crr", "lr"):
+        raise ValueError(f"Méthode d'arbre inconnue : {method}")
+    S, K, T, r, sigma, q, is_call = _inputs(S, K, T, r, sigma, q, option_type)
+    valid = (sigma > 0) & (T > 0) & (S > 0) & (K > 0)
+    idx = np.flatnonzero(valid)
+    flat = [np.ravel(v)[idx] for v in (S, K, T, r, sigma, q, is_call)]
+    tasks = [
+        (*(v[start:start + chunk_size] for v in flat), steps, method)
+        for start in range(0, idx.size, chunk_size)
+    ]
+
+    if n_workers and n_workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            chunks = list(pool.map(_tree_chunk, tasks))
+    else:
+        chunks = [_tree_chunk(task) for task in tasks]
+
+    price = np.zeros(S.shape)
+    if chunks:
+        price.ravel()[idx] = np.concatenate(chunks)
+    return price
+
+
+def american_price(S, K, T, r, sigma, option_type='call', q=0.0, model="baw", steps=DEFAULT_STEPS,
+                   n_workers=None):
+    # Point d'entrée unique : "baw" (analytique, rapide) ou arbre "crr" / "lr"
+    if model == "baw":
+        return baw_price(S, K, T, r, sigma, option_type, q)
+    if model in ("crr", "lr"):
+        return tree_price(S, K, T, r, sigma, option_type, q, steps, model, n_workers=n_workers)
+    raise ValueError(f"Modèle américain inconnu : {model}")
+
+
+@profiled()
+def american_greeks(S, K, T, r, sigma, option_type='call', q=0.0, model="baw", steps=DEFAULT_STEPS,
+                    n_workers=None):
+    # Grecques par différences finies, mêmes unités que bs_greeks (vega et rho pour 1 point,
+    # théta par jour). Les 7 scénarios choqués sont empilés et valorisés en un seul appel.
+    S, K, T, r, sigma, q, is_call = _inputs(S, K, T, r, sigma, q, option_type)
+    valid = (sigma > 0) & (T > 0) & (S > 0) & (K > 0)
+    dS = BUMP_SPOT * S
+    dv = np.minimum(BUMP_VOL, 0.5 * sigma)
+    dt = np.minimum(BUMP_DAY, 0.5 * T)
+    scenarios = [
+        (S, sigma, T, r),
+        (S + dS, sigma, T, r),
+        (S - dS, sigma, T, r),
+        (S, sigma + dv, T, r),
+        (S, sigma - dv, T, r),
+        (S, sigma, T - dt, r),
+        (S, sigma, T, r + BUMP_RATE),
+    ]
+    stacked = [np.stack([sc[i] for sc in scenarios]) for i in range(4)]
+    prices = american_price(
+        stacked[0], np.broadcast_to(K, stacked[0].shape), stacked[2], stacked[3], stacked[1],
+        np.broadcast_to(np.where(is_call, 'call', 'put'), stacked[0].shape),
+        np.broadcast_to(q, stacked[0].shape), model, steps, n_workers,
+    )
+    base, up, down, vol_up, vol_down, later, rate_up = prices
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greeks = {
+            "price": base,
+            "delta": (up - down) / (2 * dS),
+            "gamma": (up - 2 * base + down) / (dS * dS),
+            "vega": (vol_up - vol_down) / (2 * dv) / 100,
+            "theta": (later - base) / dt / 365,
+            "rho": (rate_up - base) / BUMP_RATE / 100,
+        }
+    return {name: np.where(valid, value, 0.0) for name, value in greeks.items()}
+
+
+@profiled()
+def american_iv(price, S, K, T, r, option_type='call', q=0.0, model="baw", steps=DEFAULT_STEPS,
+                tol=1e-6, max_iter=50, vol_min=1e-4, vol_max=5.0, n_workers=None):
+    # Même schéma que implied_volatility : Newton encadré par une bissection, ici avec
+    # une vega par différence finie (prix et prix choqué valorisés dans le même batch).
+    # Point de départ : l'IV européenne, qui majore l'IV américaine d'un même prix.
+    price, S, K, T, r, q = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (price, S, K, T, r, q))
+    )
+    is_call = np.broadcast_to(_is_call(option_type), S.shape)
+    sign = np.where(is_call, 1.0, -1.0)
+    iv = np.full(S.shape, np.nan)
+    converged = np.zeros(S.shape, dtype=bool)
+
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        forward_s = S * np.exp(-q * T)
+        european_lower = sign * (forward_s - K * np.exp(-r * T))
+        lower = np.maximum(np.maximum(sign * (S - K), european_lower), 0.0)
+        upper = np.where(is_call, S, K)
+        # Valeur temps nulle (à tol près) : exercice immédiat, toute vol au-delà convient
+        valid = (T > 0) & (S > 0) & (K > 0) & (price - lower > tol * K) & (price < upper)
+
+    idx = np.flatnonzero(valid)
+    p, s, k, t, rr, qq, call = (np.ravel(a)[idx] for a in (price, S, K, T, r, q, is_call))
+    kind = np.where(call, 'call', 'put')
+    guess, _ = implied_volatility(p, s * np.exp(-qq * t), k, t, rr, kind, tol=1e-4, max_iter=20)
+    sigma = np.clip(np.nan_to_num(guess, nan=0.3), vol_min, vol_max)
+    lo = np.full(idx.shape, vol_min)
+    hi = np.full(idx.shape, vol_max)
+
+    active = np.arange(idx.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        sa = sigma[active]
+        h = np.maximum(1e-4, 1e-3 * sa)
+        both = american_price(
+            np.tile(s[active], 2), np.tile(k[active], 2), np.tile(t[active], 2), np.tile(rr[active], 2),
+            np.concatenate([sa, sa + h]), np.tile(kind[active], 2), np.tile(qq[active], 2),
+            model, steps, n_workers,
+        )
+        model_price, bumped = both[:active.size], both[active.size:]
+        vega = (bumped - model_price) / h
+        diff = model_price - p[active]
+
+        done = np.abs(diff) < tol * np.maximum(vega, 1e-12)
+        converged.ravel()[idx[active[done]]] = True
+        iv.ravel()[idx[active[done]]] = sa[done]
+
+        too_high = diff > 0
+        hi[active] = np.where(too_high, sa, hi[active])
+        lo[active] = np.where(too_high, lo[active], sa)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sa - diff / vega
+        in_bracket = (newton > lo[active]) & (newton < hi[active])
+        sigma[active] = np.where(in_bracket, newton, 0.5 * (lo[active] + hi[active]))
+
+        # Intervalle réduit sous la tolérance : la vega est trop faible pour le critère relatif.
+        # Accepté seulement si le prix est atteint au dernier point évalué ; sinon l'intervalle
+        # s'est refermé sur vol_min / vol_max et le prix cible est hors d'atteinte (NaN)
+        collapsed = (hi[active] - lo[active]) < tol
+        reached = collapsed & ~done & (np.abs(diff) < tol * np.maximum(p[active], 1.0))
+        converged.ravel()[idx[active[reached]]] = True
+        iv.ravel()[idx[active[reached]]] = sa[reached]
+
+        active = active[~(done | collapsed)]
+
+    return iv, converged
+
+
+@profiled()
+def compute_american_greeks(df, S, T, r, option_type='call', q=0.0, model="baw", steps=DEFAULT_STEPS,
+                            solve_iv=False, n_workers=None):
+    # Pendant américain de visuals.compute_greeks pour une chaîne entière : IV (recalculée
+    # sous le modèle américain depuis les prix mid/last si solve_iv), prix, prime
+    # d'exercice anticipé par rapport à Black-Scholes et grecques par différences finies
+    chain = as_strike_chain(df)
+    if solve_iv:
+        quotes = {name: chain[name] for name in ("lastPrice", "bid", "ask") if name in chain}
+        iv, converged = american_iv(option_mid(quotes), S, chain["strike"], T, r, option_type, q, model, steps,
+                                    n_workers=n_workers)
+        keep = converged & (iv > 0)
+    else:
+        iv = chain["impliedVolatility"]
+        keep = ~np.isnan(iv) & (iv > 0)
+
+    K = chain["strike"][keep]
+    sigma = iv[keep]
+    greeks = american_greeks(S, K, T, r, sigma, option_type, q, model, steps, n_workers)
+    # Black-Scholes avec rendement q = Black-Scholes sur le spot actualisé S·e^(-qT)
+    european = bs_price(S * np.exp(-q * T), K, T, r, sigma, option_type)
+    return pd.DataFrame({
+        "Strike": K,
+        "IV": sigma,
+        "Prix": greeks["price"],
+        "Prime d'exercice": greeks["price"] - european,
+        "Delta": greeks["delta"],
+        "Gamma": greeks["gamma"],
+        "Vega": greeks["vega"],
+        "Theta": greeks["theta"],
+        "Rho": greeks["rho"],
+    })
@@ -0,0 +1,116 @@
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def _column_array(series):
+    if pd.api.types.is_bool_dtype(series):
+        return series.to_numpy(dtype=bool)
+    if pd.api.types.is_numeric_dtype(series):
+        return np.ascontiguousarray(series.to_numpy(dtype=np.float64, na_value=np.nan))
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        return series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy()
+    return series.to_numpy()
+
+
+class StrikeChain:
+    # Un côté de la chaîne (calls ou puts) trié par strike, stocké en colonnes numpy
+    # contiguës : lookup exact O(1), strike le plus proche O(log n), tranches sans copie.
+
+    def __init__(self, columns):
+        self._columns = columns
+        self._index = None
+
+    @classmethod
+    def from_frame(cls, df):
+        df = df.dropna(subset=["strike"])
+        df = df.drop_duplicates(subset="strike").sort_values("strike", kind="stable")
+        return cls({name: _column_array(df[name]) for name in df.columns})
+
+    @property
+    def strikes(self):
+        return self._columns["strike"]
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def nbytes(self):
+        # Colonnes objet (contractSymbol, currency…) : pointeurs plus la taille des chaînes,
+        # comme memory_usage(deep=True)
+        return sum(
+            col.nbytes + (sum(sys.getsizeof(v) for v in col) if col.dtype == object else 0)
+            for col in self._columns.values()
+        )
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    def loc(self, strike):
+        if self._index is None:
+            self._index = {k: i for i, k in enumerate(self.strikes.tolist())}
+        return self._index[float(strike)]
+
+    def get(self, strike, column="lastPrice"):
+        return self._columns[column][self.loc(strike)]
+
+    def nearest_index(self, x):
+        strikes = self.strikes
+        i = int(np.searchsorted(strikes, x))
+        if i == 0:
+            return 0
+        if i == len(strikes):
+            return i - 1
+        return i if strikes[i] - x < x - strikes[i - 1] else i - 1
+
+    def atm_strike(self, spot):
+        return self.strikes[self.nearest_index(spot)]
+
+    def slice(self, start, stop):
+        return StrikeChain({name: col[start:stop] for name, col in self._columns.items()})
+
+    def between(self, lo, hi):
+        start = np.searchsorted(self.strikes, lo, side="left")
+        stop = np.searchsorted(self.strikes, hi, side="right")
+        return self.slice(start, stop)
+
+    def moneyness_band(self, spot, lo=0.8, hi=1.2):
+        return self.between(spot * lo, spot * hi)
+
+    def valid(self, *names):
+        mask = np.ones(len(self), dtype=bool)
+        for name in names:
+            if name in self._columns:
+                mask &= ~pd.isna(self._columns[name])
+            else:
+                mask[:] = False
+        if mask.all():
+            return self
+        return self.take(mask)
+
+    def take(self, rows):
+        # Sous-chaîne par positions ou masque booléen, ordre des strikes conservé
+        return StrikeChain({name: col[rows] for name, col in self._columns.items()})
+
+    def assign(self, **columns):
+        new = dict(self._columns)
+        for name, values in columns.items():
+            new[name] = np.ascontiguousarray(np.asarray(values))
+        chain = StrikeChain(new)
+        chain._index = self._index
+        return chain
+
+    def to_frame(self):
+        return pd.DataFrame(self._columns)
+
+
+def as_strike_chain(data):
+    return data if isinstance(data, StrikeChain) else StrikeChain.from_frame(data)
@@ -0,0 +1,127 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from utils.greeks import _norm_pdf, time_to_expiry
+from utils.profiling import profiled
+from utils.surface import snapshot_key
+
+EXPOSURE_CACHE_SIZE = 32
+CONTRACT_MULTIPLIER = 100
+# Convention usuelle (SpotGamma, SqueezeMetrics) : les dealers sont supposés
+# acheteurs des calls et vendeurs des puts que le public leur traite
+DEALER_SIGN = {"call": 1.0, "put": -1.0}
+# IV en deçà de ce seuil : cotation Yahoo sans contenu (strike illiquide)
+MIN_IV = 1e-3
+
+ExposureResult = namedtuple("ExposureResult", ["by_strike", "totals", "gamma_flip", "profile"])
+
+_exposure_cache = OrderedDict()
+_exposure_cache_lock = threading.Lock()
+
+
+def _contracts(surface_df, r, now=None):
+    # Colonnes utiles de la surface concaténée, filtrées une fois pour toutes
+    df = surface_df
+    iv = df["impliedVolatility"].to_numpy(dtype=np.float64, na_value=np.nan)
+    oi = df["openInterest"].to_numpy(dtype=np.float64, na_value=np.nan)
+    # Une maturité par échéance, pas par contrat
+    expiries = df["expiry"].astype(str)
+    T = expiries.map({exp: time_to_expiry(exp, now) for exp in expiries.unique()}).to_numpy(dtype=np.float64)
+    keep = (iv > MIN_IV) & (oi > 0) & (T > 0)
+
+    is_call = (df["type"].to_numpy() == "call")[keep]
+    sigma = iv[keep]
+    sqrt_t = np.sqrt(T[keep])
+    return {
+        "strike": df["strike"].to_numpy(dtype=np.float64)[keep],
+        "is_call": is_call,
+        "vol_t": sigma * sqrt_t,
+        "drift": (r + 0.5 * sigma * sigma) * T[keep],
+        "sigma": sigma,
+        # Position dealer en nombre d'unités de sous-jacent
+        "weight": oi[keep] * CONTRACT_MULTIPLIER * np.where(is_call, DEALER_SIGN["call"], DEALER_SIGN["put"]),
+    }
+
+
+def _d1(c, S):
+    return (np.log(S / c["strike"]) + c["drift"]) / c["vol_t"]
+
+
+def _gamma_exposure(c, S):
+    # GEX totale en $ pour un mouvement de 1 % du spot ; S scalaire ou array de niveaux
+    S = np.asarray(S, dtype=np.float64)[..., None]
+    gamma = _norm_pdf(_d1(c, S)) / (S * c["vol_t"])
+    return (c["weight"] * gamma * S * S * 0.01).sum(axis=-1)
+
+
+@profiled()
+def compute_exposure(surface_df, spot, r, now=None, flip_range=(0.7, 1.3), grid_points=61):
+    # Exposition gamma / delta / vanna des dealers, pondérée par l'open interest,
+    # sur toutes les échéances de la surface (sortie de load_option_surface)
+    c = _contracts(surface_df, r, now)
+    d1 = _d1(c, spot)
+    d2 = d1 - c["vol_t"]
+    pdf = _norm_pdf(d1)
+
+    gamma = pdf / (spot * c["vol_t"])
+    gex = c["weight"] * gamma * spot * spot * 0.01
+    delta = np.where(c["is_call"], ndtr(d1), ndtr(d1) - 1.0)
+    dex = c["weight"] * delta * spot
+    # Vanna = dDelta/dsigma, identique calls et puts ; exprimée pour 1 point de vol
+    vex = c["weight"] * (-pdf * d2 / c["sigma"]) * spot * 0.01
+
+    strikes, inverse = np.unique(c["strike"], return_inverse=True)
+    by_strike = pd.DataFrame({
+        "strike": strikes,
+        "gamma": np.bincount(inverse, weights=gex, minlength=len(strikes)),
+        "call_gamma": np.bincount(inverse, weights=np.where(c["is_call"], gex, 0.0), minlength=len(strikes)),
+        "put_gamma": np.bincount(inverse, weights=np.where(c["is_call"], 0.0, gex), minlength=len(strikes)),
+        "delta": np.bincount(inverse, weights=dex, minlength=len(strikes)),
+        "vanna": np.bincount(inverse, weights=vex, minlength=len(strikes)),
+    })
+    totals = {
+        "gamma": float(gex.sum()),
+        "delta": float(dex.sum()),
+        "vanna": float(vex.sum()),
+        "contracts": int(len(gex)),
+    }
+
+    # Courbe GEX(S) sur une grille grossière, puis Brent sur le changement de signe le plus proche du spot
+    levels = spot * np.linspace(*flip_range, grid_points)
+    curve = _gamma_exposure(c, levels)
+    gamma_flip = None
+    crossings = np.flatnonzero(np.sign(curve[:-1]) * np.sign(curve[1:]) < 0)
+    if crossings.size:
+        from scipy.optimize import brentq
+
+        i = crossings[np.argmin(np.abs(levels[crossings] - spot))]
+        gamma_flip = brentq(lambda s: _gamma_exposure(c, s), levels[i], levels[i + 1], xtol=1e-6 * spot)
+
+    profile = pd.Series(curve, index=pd.Index(levels, name="spot"), name="gamma")
+
+    return ExposureResult(by_strike, totals, gamma_flip, profile)
+
+
+@profiled()
+def get_exposure(ticker, surface_df, spot, r, snapshot=None, now=None):
+    # Même principe que get_vol_surface : un résultat par (ticker, snapshot, spot, r),
+    # l'open interest fait partie de la clé du snapshot. `now` fixe la date en replay.
+    if snapshot is None:
+        snapshot = snapshot_key(surface_df, ("expiry", "type", "strike", "impliedVolatility", "openInterest"))
+    key = (ticker, snapshot, float(spot), float(r), now)
+    with _exposure_cache_lock:
+        result = _exposure_cache.get(key)
+        if result is not None:
+            _exposure_cache.move_to_end(key)
+            return result
+
+    result = compute_exposure(surface_df, spot, r, now)
+    with _exposure_cache_lock:
+        _exposure_cache[key] = result
+        while len(_exposure_cache) > EXPOSURE_CACHE_SIZE:
+            _exposure_cache.popitem(last=False)
+    return result
@@ -1,15 +1,186 @@
-from scipy.stats import norm
-from math import log, sqrt
+import numpy as np
+import pandas as pd
+from scipy.special import ndtr
+
+from utils.profiling import profiled
+
+_INV_SQRT_2PI = 1.0 / np.sqrt(2.0 * np.pi)
+
+
+def _norm_pdf(x):
+    return _INV_SQRT_2PI * np.exp(-0.5 * x * x)
+
+
+def _is_call(option_type):
+    kind = np.char.lower(np.asarray(option_type, dtype=str))
+    return (kind == 'call') | (kind == 'c')
+
+
+def bs_greeks(S, K, T, r, sigma, option_type='call'):
+    # Moteur Black-Scholes vectorisé : tous les arguments peuvent être des scalaires ou des arrays
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (S, K, T, r, sigma))
+    )
+    is_call = np.broadcast_to(_is_call(option_type), S.shape)
+
+    # Les contrats invalides (IV, T, S ou K <= 0 ou NaN) renvoient 0 sans branchement Python
+    valid = (sigma > 0) & (T > 0) & (S > 0) & (K > 0)
+    S_ = np.where(valid, S, 1.0)
+    K_ = np.where(valid, K, 1.0)
+    T_ = np.where(valid, T, 1.0)
+    sig = np.where(valid, sigma, 1.0)
+
+    sqrt_t = np.sqrt(T_)
+    vol_t = sig * sqrt_t
+    d1 = (np.log(S_ / K_) + (r + 0.5 * sig * sig) * T_) / vol_t
+    d2 = d1 - vol_t
+
+    pdf_d1 = _norm_pdf(d1)
+    sign = np.where(is_call, 1.0, -1.0)
+    nd1 = ndtr(sign * d1)
+    nd2 = ndtr(sign * d2)
+    discount = np.exp(-r * T_)
+
+    price = sign * (S_ * nd1 - K_ * discount * nd2)
+    delta = sign * nd1
+    gamma = pdf_d1 / (S_ * vol_t)
+    vega = S_ * pdf_d1 * sqrt_t / 100
+    theta = (-S_ * pdf_d1 * sig / (2 * sqrt_t) - sign * r * K_ * discount * nd2) / 365
+    rho = sign * K_ * T_ * discount * nd2 / 100
+
+    return {
+        name: np.where(valid, value, 0.0)
+        for name, value in (
+            ("price", price),
+            ("delta", delta),
+            ("gamma", gamma),
+            ("vega", vega),
+            ("theta", theta),
+            ("rho", rho),
+        )
+    }
+
+
+def bs_price(S, K, T, r, sigma, option_type='call'):
+    # Chemin prix seul, sans calculer les Greeks (utilisé en boucle par le Monte Carlo)
+    S, K, T, r, sigma = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (S, K, T, r, sigma))
+    )
+    sign = np.where(np.broadcast_to(_is_call(option_type), S.shape), 1.0, -1.0)
+    valid = (sigma > 0) & (T > 0) & (S > 0) & (K > 0)
+    price, _ = _price_vega(
+        np.where(valid, S, 1.0),
+        np.where(valid, K, 1.0),
+        np.where(valid, T, 1.0),
+        r,
+        np.where(valid, sigma, 1.0),
+        sign,
+    )
+    return np.where(valid, price, 0.0)
+
+
+def _price_vega(S, K, T, r, sigma, sign):
+    sqrt_t = np.sqrt(T)
+    vol_t = sigma * sqrt_t
+    d1 = (np.log(S / K) + (r + 0.5 * sigma * sigma) * T) / vol_t
+    d2 = d1 - vol_t
+    price = sign * (S * ndtr(sign * d1) - K * np.exp(-r * T) * ndtr(sign * d2))
+    return price, S * _norm_pdf(d1) * sqrt_t
+
+
+def implied_volatility(price, S, K, T, r, option_type='call', tol=1e-6, max_iter=50,
+                       vol_min=1e-4, vol_max=5.0):
+    # Newton vectorisé, encadré par une bissection : chaque itération réduit
+    # l'intervalle [lo, hi] et tout pas de Newton qui en sort est remplacé par le milieu.
+    price, S, K, T, r = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (price, S, K, T, r))
+    )
+    sign = np.where(np.broadcast_to(_is_call(option_type), S.shape), 1.0, -1.0)
+    iv = np.full(S.shape, np.nan)
+    converged = np.zeros(S.shape, dtype=bool)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discounted_k = K * np.exp(-r * T)
+        lower = np.maximum(sign * (S - discounted_k), 0.0)
+        upper = np.where(sign > 0, S, discounted_k)
+        valid = (T > 0) & (S > 0) & (K > 0) & (price > lower) & (price < upper)
+
+    idx = np.flatnonzero(valid)
+    p, s, k, t, rr, sg = (a.ravel()[idx] for a in (price, S, K, T, r, sign))
+    x = k * np.exp(-rr * t)
+
+    # Estimation initiale de Corrado-Miller, calculée sur le prix du call équivalent (parité)
+    c = np.where(sg > 0, p, p + s - x)
+    half = c - (s - x) / 2
+    root = np.sqrt(np.maximum(half * half - (s - x) ** 2 / np.pi, 0.0))
+    sigma = np.sqrt(2 * np.pi / t) / (s + x) * (half + root)
+    lo = np.full(idx.shape, vol_min)
+    hi = np.full(idx.shape, vol_max)
+    sigma = np.clip(np.nan_to_num(sigma, nan=0.3), vol_min, vol_max)
+
+    active = np.arange(idx.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        sa = sigma[active]
+        model, vega = _price_vega(s[active], k[active], t[active], rr[active], sa, sg[active])
+        diff = model - p[active]
+
+        # Critère en unités de vol : |erreur de prix| / vega < tol
+        done = np.abs(diff) < tol * vega
+        converged.ravel()[idx[active[done]]] = True
+        iv.ravel()[idx[active[done]]] = sa[done]
+
+        too_high = diff > 0
+        hi[active] = np.where(too_high, sa, hi[active])
+        lo[active] = np.where(too_high, lo[active], sa)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sa - diff / vega
+        in_bracket = (newton > lo[active]) & (newton < hi[active])
+        sigma[active] = np.where(in_bracket, newton, 0.5 * (lo[active] + hi[active]))
+
+        active = active[~done]
+
+    return iv, converged
+
+
+def time_to_expiry(exp, now=None):
+    # Les options listées US expirent à 16h heure de New York
+    expiry = pd.Timestamp(exp).tz_localize("America/New_York") + pd.Timedelta(hours=16)
+    now = pd.Timestamp.now(tz="America/New_York") if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        # Horodatage naïf : interprété en heure de New York, comme l'échéance
+        now = now.tz_localize("America/New_York")
+    return max((expiry - now).total_seconds() / (365 * 24 * 3600), 0.0)
+
+
+def option_mid(df):
+    last = np.asarray(df["lastPrice"], dtype=np.float64)
+    if "bid" not in df or "ask" not in df:
+        return last
+    bid = np.asarray(df["bid"], dtype=np.float64)
+    ask = np.asarray(df["ask"], dtype=np.float64)
+    return np.where((bid > 0) & (ask > 0), (bid + ask) / 2, last)
+
+
+@profiled()
+def with_solved_iv(df, S, T, r, option_type='call'):
+    # Accepte un DataFrame ou une StrikeChain (même interface assign)
+    iv, converged = implied_volatility(
+        option_mid(df),
+        S,
+        np.asarray(df["strike"], dtype=np.float64),
+        T,
+        r,
+        option_type,
+    )
+    return df.assign(
+        vendorImpliedVolatility=df["impliedVolatility"],
+        impliedVolatility=iv,
+        ivConverged=converged,
+    )
+
 
 def compute_delta(S, K, T, r, sigma, option_type='call'):
-    if sigma <= 0 or T <= 0 or S <= 0 or K <= 0:
-        return 0.0
-
-    try:
-        d1 = (log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt(T))
-        if option_type == 'call':
-            return norm.cdf(d1)
-        else:
-            return norm.cdf(d1) - 1
-    except:
-        return 0.0
\ No newline at end of file
+    return float(bs_greeks(S, K, T, r, sigma, option_type)["delta"])
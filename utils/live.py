@@ -0,0 +1,270 @@
+import numpy as np
+import pandas as pd
+
+from utils.american import DEFAULT_STEPS, compute_american_greeks
+from utils.chain import as_strike_chain
+from utils.greeks import bs_greeks, implied_volatility, option_mid
+from utils.profiling import profiled
+from utils.visuals import IncrementalGrid, plot_iv_smile, plot_option_price_grid
+from utils.yf_data import OptionChain
+
+# Colonnes de cotation comparées d'un tick à l'autre pour détecter un contrat modifié
+QUOTE_COLUMNS = ("lastPrice", "bid", "ask", "impliedVolatility", "volume", "openInterest")
+GREEKS = ("delta", "gamma", "vega", "theta", "rho")
+
+
+def diff_chains(prev, curr, columns=QUOTE_COLUMNS):
+    # Compare deux StrikeChain triées par strike. Renvoie le masque des lignes de `curr`
+    # nouvelles ou modifiées, la position de chaque ligne dans `prev` (-1 si absente)
+    # et les positions de `prev` disparues de `curr`.
+    n = len(curr)
+    if prev is None:
+        return np.ones(n, dtype=bool), np.full(n, -1), np.empty(0, dtype=np.intp)
+
+    strikes, prev_strikes = curr.strikes, prev.strikes
+    if n == len(prev) and np.array_equal(strikes, prev_strikes):
+        pos = np.arange(n)
+        present = np.ones(n, dtype=bool)
+        removed = np.empty(0, dtype=np.intp)
+    else:
+        pos = np.minimum(np.searchsorted(prev_strikes, strikes), max(len(prev) - 1, 0))
+        present = (prev_strikes[pos] == strikes) if len(prev) else np.zeros(n, dtype=bool)
+        pos = np.where(present, pos, -1)
+        kept = np.zeros(len(prev), dtype=bool)
+        kept[pos[present]] = True
+        removed = np.flatnonzero(~kept)
+
+    changed = ~present
+    src = pos[present]
+    for name in columns:
+        if name not in curr or name not in prev:
+            continue
+        a, b = curr[name][present], prev[name][src]
+        changed[present] |= ~((a == b) | (np.isnan(a) & np.isnan(b)))
+    return changed, pos, removed
+
+
+class LiveSide:
+    # État dérivé d'un côté de la chaîne (IV, grecques, cellules de heatmap, agrégats
+    # de la ligne de métriques), recalculé uniquement pour les contrats modifiés.
+
+    def __init__(self, option_type, solve_iv=False):
+        self.option_type = option_type
+        self.solve_iv = solve_iv
+        self.chain = None
+        self.grid = None
+        self.version = 0
+        self._derived = None
+        self._american = None
+        self._cache = {}
+
+    def _empty(self, n):
+        derived = {
+            "iv": np.full(n, np.nan),
+            "converged": np.ones(n, dtype=bool),
+            "valid": np.zeros(n, dtype=bool),
+            "cell": np.full(n, -1),
+            "z": np.zeros(n),
+        }
+        derived.update({name: np.zeros(n) for name in GREEKS})
+        return derived
+
+    def _compute(self, chain, idx, S, T, r):
+        K = chain["strike"][idx]
+        last = chain["lastPrice"][idx] if "lastPrice" in chain else np.full(idx.size, np.nan)
+        if self.solve_iv:
+            quotes = {name: chain[name][idx] for name in ("lastPrice", "bid", "ask") if name in chain}
+            iv, converged = implied_volatility(option_mid(quotes), S, K, T, r, self.option_type)
+        else:
+            iv = chain["impliedVolatility"][idx] if "impliedVolatility" in chain else np.full(idx.size, np.nan)
+            converged = np.ones(idx.size, dtype=bool)
+
+        greeks = bs_greeks(S, K, T, r, np.nan_to_num(iv), self.option_type)
+        out = {name: np.broadcast_to(greeks[name], idx.shape) for name in GREEKS}
+        out.update(iv=iv, converged=converged, valid=~np.isnan(iv) & ~np.isnan(last), z=last)
+        return out
+
+    def update(self, chain, S, T, r, full=False):
+        # Renvoie le nombre de contrats recalculés ou retirés à ce tick
+        chain = as_strike_chain(chain)
+        changed, pos, removed = diff_chains(self.chain, chain)
+        if full:
+            changed[:] = True
+
+        prev = self._derived
+        derived = self._empty(len(chain))
+        kept = pos >= 0
+        if prev is not None:
+            for name, values in prev.items():
+                derived[name][kept] = values[pos[kept]]
+
+        idx = np.flatnonzero(changed)
+        if idx.size == 0 and removed.size == 0:
+            self.chain = chain
+            return 0
+
+        # Retrait des anciennes contributions (contrats disparus ou recotés) de la grille
+        if prev is not None and self.grid is not None:
+            old = np.concatenate([removed, pos[idx][kept[idx]]])
+            self.grid.remove(prev["cell"][old], prev["z"][old])
+
+        new = self._compute(chain, idx, S, T, r)
+        for name, values in new.items():
+            derived[name][idx] = values
+
+        valid = derived["valid"]
+        if self.grid is not None:
+            cells = np.where(new["valid"], self.grid.locate(chain["strike"][idx], new["iv"]), -1)
+            derived["cell"][idx] = cells
+        if self.grid is None or (new["valid"] & (derived["cell"][idx] < 0)).any():
+            # Contrat hors des bornes de la grille (ou premier tick) : reconstruction complète
+            self.grid = None
+            derived["cell"][:] = -1
+            if valid.any():
+                self.grid = IncrementalGrid(chain["strike"][valid], derived["iv"][valid], derived["z"][valid])
+                derived["cell"][valid] = self.grid.locate(chain["strike"][valid], derived["iv"][valid])
+        else:
+            self.grid.add(cells, new["z"])
+
+        if self._american is not None:
+            self._american = self._remap_american(self._american, pos, idx)
+        self.chain = chain
+        self._derived = derived
+        self.version += 1
+        self._cache.clear()
+        return int(idx.size + removed.size)
+
+    def _cached(self, name, build):
+        if name not in self._cache:
+            self._cache[name] = build()
+        return self._cache[name]
+
+    def view(self):
+        # StrikeChain des contrats exploitables, IV recalculée le cas échéant (cf. with_solved_iv)
+        def build():
+            chain = self.chain
+            if self.solve_iv:
+                chain = chain.assign(
+                    vendorImpliedVolatility=chain["impliedVolatility"],
+                    impliedVolatility=self._derived["iv"],
+                    ivConverged=self._derived["converged"],
+                )
+            return chain.valid("impliedVolatility", "lastPrice")
+        return self._cached("view", build)
+
+    @property
+    def n_contracts(self):
+        return 0 if self.chain is None else len(self.chain)
+
+    @property
+    def n_unconverged(self):
+        return 0 if self._derived is None else int((~self._derived["converged"]).sum())
+
+    def iv_mean(self):
+        return self._cached("iv_mean", lambda: float(np.nanmean(self._derived["iv"][self._derived["valid"]]))
+                            if self._derived["valid"].any() else float("nan"))
+
+    def greeks_frame(self):
+        def build():
+            d = self._derived
+            keep = d["valid"] & (d["iv"] > 0)
+            return pd.DataFrame({
+                "Strike": self.chain["strike"][keep],
+                "IV": d["iv"][keep],
+                **{name.capitalize(): d[name][keep] for name in GREEKS},
+            })
+        return self._cached("greeks", build)
+
+    @staticmethod
+    def _remap_american(american, pos, idx):
+        # Réaligne les résultats américains sur la nouvelle chaîne : les contrats conservés
+        # gardent leur ligne, les contrats nouveaux ou recotés sont à recalculer
+        kept = pos >= 0
+        stale = np.ones(len(pos), dtype=bool)
+        stale[kept] = american["stale"][pos[kept]]
+        stale[idx] = True
+        rows = {}
+        for name, values in american["rows"].items():
+            rows[name] = np.full(len(pos), np.nan)
+            rows[name][kept] = values[pos[kept]]
+        keep = np.zeros(len(pos), dtype=bool)
+        keep[kept] = american["keep"][pos[kept]]
+        return {**american, "rows": rows, "keep": keep & ~stale, "stale": stale}
+
+    def american_frame(self, S, T, r, q=0.0, model="baw", steps=DEFAULT_STEPS):
+        # Grecques sous exercice américain, même filtre que greeks_frame ; en IV recalculée,
+        # l'IV est réinversée sous le modèle américain depuis les prix mid/last.
+        # Résultats conservés par contrat : à chaque tick, seuls les contrats modifiés
+        # repassent par l'arbre, tant que le marché et les paramètres du modèle sont inchangés.
+        params = (S, T, r, q, model, steps)
+
+        def build():
+            n = len(self.chain)
+            american = self._american
+            if american is None or american["params"] != params:
+                american = {"params": params, "rows": {}, "keep": np.zeros(n, dtype=bool),
+                            "stale": np.ones(n, dtype=bool)}
+            todo = american["stale"].copy()
+            if "lastPrice" in self.chain:
+                todo &= ~np.isnan(self.chain["lastPrice"])
+            if todo.any():
+                frame = compute_american_greeks(self.chain.take(todo), S, T, r, self.option_type, q, model,
+                                                steps, self.solve_iv)
+                rows = np.searchsorted(self.chain.strikes, frame["Strike"].to_numpy())
+                for name in frame.columns:
+                    column = american["rows"].setdefault(name, np.full(n, np.nan))
+                    column[rows] = frame[name].to_numpy()
+                american["keep"][rows] = True
+            american["stale"][:] = False
+            self._american = american
+            return pd.DataFrame({name: values[american["keep"]] for name, values in american["rows"].items()})
+        return self._cached(("american", *params), build)
+
+    def heatmap_figure(self):
+        return self._cached("heatmap", lambda: plot_option_price_grid(self.grid, self.option_type))
+
+
+class LiveChain:
+    # Mode live : chaque tick compare la chaîne à la précédente par (type, strike)
+    # et ne recalcule que les contrats modifiés. Tant que le spot bouge de moins de
+    # `spot_tolerance` (relatif) et la maturité de moins de `time_tolerance` (années),
+    # les grecques des contrats inchangés sont conservées ; au-delà, tout est recalculé.
+
+    def __init__(self, solve_iv=False, spot_tolerance=1e-4, time_tolerance=60 / (365 * 24 * 3600)):
+        self.calls = LiveSide("call", solve_iv)
+        self.puts = LiveSide("put", solve_iv)
+        self.spot_tolerance = spot_tolerance
+        self.time_tolerance = time_tolerance
+        self.market = None
+        self.last_changes = {"call": 0, "put": 0}
+        self._figures = {}
+
+    def _same_market(self, S, T, r):
+        if self.market is None:
+            return False
+        S0, T0, r0 = self.market
+        return r == r0 and abs(S / S0 - 1) <= self.spot_tolerance and abs(T - T0) <= self.time_tolerance
+
+    @profiled()
+    def update(self, chain, S, T, r):
+        full = not self._same_market(S, T, r)
+        if full:
+            self.market = (S, T, r)
+        self.last_changes = {
+            "call": self.calls.update(chain.calls, *self.market, full=full),
+            "put": self.puts.update(chain.puts, *self.market, full=full),
+        }
+        return self.last_changes
+
+    @property
+    def versions(self):
+        return self.calls.version, self.puts.version
+
+    def view(self):
+        return OptionChain(self.calls.view(), self.puts.view(), None)
+
+    def smile_figure(self):
+        cached = self._figures.get("smile")
+        if cached is None or cached[0] != self.versions:
+            cached = self._figures["smile"] = (self.versions, plot_iv_smile(self.view()))
+        return cached[1]
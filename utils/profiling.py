@@ -0,0 +1,191 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+DEFAULT_CAPACITY = 2048
+
+
+class StageTimer:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self._start = time.perf_counter()
+        self._mem = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+    def stop(self):
+        wall = time.perf_counter() - self._start
+        allocated = None
+        if self._mem is not None and tracemalloc.is_tracing():
+            allocated = tracemalloc.get_traced_memory()[0] - self._mem
+        self.profiler.record(self.name, wall, allocated)
+        return wall
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _NullTimer:
+    def stop(self):
+        return 0.0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def current_session():
+    # Id de la session Streamlit du thread courant (run du script ou fragment), None hors Streamlit.
+    # Import différé : les benchmarks et le CLI n'importent pas streamlit pour autant.
+    if "streamlit" not in sys.modules:
+        return None
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return None if ctx is None else ctx.session_id
+
+
+class Profiler:
+    # Mesures par étape (temps, appels, mémoire allouée) dans un buffer circulaire
+    # partagé par toutes les sessions, plus des agrégats cumulés pour l'export.
+    # Chaque mesure porte l'id de sa session : le profiling s'active session par session
+    # (toggle de la sidebar), ou pour tout le process via OPTIONS_DASHBOARD_PROFILE.
+    # tracemalloc est global au process : il ne s'active que par OPTIONS_DASHBOARD_PROFILE_MEMORY.
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, enabled=False, track_memory=False):
+        self.always = enabled
+        self._sessions = set()
+        self._records = deque(maxlen=capacity)
+        self._totals = {}
+        self._lock = threading.Lock()
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @property
+    def enabled(self):
+        return self.always or (bool(self._sessions) and current_session() in self._sessions)
+
+    @property
+    def tracks_memory(self):
+        return tracemalloc.is_tracing()
+
+    def enable(self, session=None):
+        # Hors d'un run Streamlit, pas de session à cibler : le profiling global passe par `always`
+        session = session or current_session()
+        if session is None:
+            raise ValueError("Aucune session Streamlit : utiliser profiler.always = True pour tout le process")
+        with self._lock:
+            self._sessions.add(session)
+
+    def disable(self, session=None):
+        session = session or current_session()
+        if session is None:
+            return
+        with self._lock:
+            self._sessions.discard(session)
+
+    def stage(self, name):
+        return StageTimer(self, name) if self.enabled else _NullTimer()
+
+    def record(self, name, wall, allocated=None):
+        record = {
+            "stage": name,
+            "wall": wall,
+            "allocated": allocated,
+            "time": time.time(),
+            "thread": threading.current_thread().name,
+            "session": current_session(),
+        }
+        with self._lock:
+            self._records.append(record)
+            total = self._totals.setdefault(name, {"calls": 0, "wall": 0.0, "max": 0.0, "allocated": 0})
+            total["calls"] += 1
+            total["wall"] += wall
+            total["max"] = max(total["max"], wall)
+            total["allocated"] += allocated or 0
+
+    def records(self, since=None, session=None):
+        with self._lock:
+            return [
+                r for r in self._records
+                if (since is None or r["time"] >= since) and (session is None or r["session"] == session)
+            ]
+
+    def summary(self, since=None, session=None):
+        if since is None and session is None:
+            with self._lock:
+                return {name: dict(total) for name, total in self._totals.items()}
+        out = {}
+        for r in self.records(since, session):
+            total = out.setdefault(r["stage"], {"calls": 0, "wall": 0.0, "max": 0.0, "allocated": 0})
+            total["calls"] += 1
+            total["wall"] += r["wall"]
+            total["max"] = max(total["max"], r["wall"])
+            total["allocated"] += r["allocated"] or 0
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._records.clear()
+            self._totals.clear()
+
+    def to_json(self, indent=None, session=None):
+        return json.dumps({"summary": self.summary(session=session), "records": self.records(session=session)}, indent=indent)
+
+    def to_prometheus(self, prefix="options_dashboard"):
+        lines = [
+            f"# HELP {prefix}_stage_seconds Temps passé par étape du dashboard.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        summary = self.summary()
+        for name, total in sorted(summary.items()):
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total["wall"]:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {total["calls"]}')
+        lines += [
+            f"# HELP {prefix}_stage_max_seconds Durée maximale observée par étape.",
+            f"# TYPE {prefix}_stage_max_seconds gauge",
+        ]
+        for name, total in sorted(summary.items()):
+            lines.append(f'{prefix}_stage_max_seconds{{stage="{name}"}} {total["max"]:.9f}')
+        lines += [
+            f"# HELP {prefix}_stage_allocated_bytes_total Mémoire nette allouée par étape (tracemalloc).",
+            f"# TYPE {prefix}_stage_allocated_bytes_total counter",
+        ]
+        for name, total in sorted(summary.items()):
+            lines.append(f'{prefix}_stage_allocated_bytes_total{{stage="{name}"}} {total["allocated"]}')
+        return "\n".join(lines) + "\n"
+
+
+profiler = Profiler(
+    enabled=bool(os.environ.get("OPTIONS_DASHBOARD_PROFILE")),
+    track_memory=bool(os.environ.get("OPTIONS_DASHBOARD_PROFILE_MEMORY")),
+)
+
+
+def stage(name):
+    return profiler.stage(name)
+
+
+def profiled(name=None):
+    def decorator(fn):
+        stage_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            with profiler.stage(stage_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,230 @@
+# Scanner multi-tickers : python -m utils.scanner AAPL MSFT SPY --out scan.csv
+import argparse
+import os
+import sys
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils.greeks import bs_greeks, option_mid, time_to_expiry
+from utils.yf_data import get_cache
+
+SCAN_COLUMNS = {
+    "ticker": "object",
+    "spot": "float64",
+    "expiry": "object",
+    "days": "float64",
+    "atm_strike": "float64",
+    "atm_iv": "float64",
+    "hv30": "float64",
+    "iv_hv_ratio": "float64",
+    "iv_rank_hv": "float64",
+    "skew_slope": "float64",
+    "straddle": "float64",
+    "implied_move": "float64",
+    "atm_call_delta": "float64",
+    "put_call_premium": "float64",
+    "error": "object",
+}
+
+
+def _pick_expiry(expirations, target_days, now=None):
+    days = np.array([time_to_expiry(exp, now) * 365 for exp in expirations])
+    candidates = np.flatnonzero(days > 0)
+    if candidates.size == 0:
+        raise ValueError("aucune échéance future")
+    best = candidates[np.argmin(np.abs(days[candidates] - target_days))]
+    return expirations[best], days[best] / 365
+
+
+def _realized_vol(closes, window=21):
+    returns = np.diff(np.log(closes))
+    if returns.size < window:
+        return np.array([np.nan])
+    windows = np.lib.stride_tricks.sliding_window_view(returns, window)
+    return windows.std(axis=1, ddof=1) * np.sqrt(252)
+
+
+def _skew_slope(calls, puts, spot, band=0.2):
+    # Pente de l'IV des options OTM en fonction de log(K/S) : négative = skew baissier
+    strikes = np.concatenate([puts.strikes[puts.strikes < spot], calls.strikes[calls.strikes >= spot]])
+    iv = np.concatenate([
+        puts["impliedVolatility"][puts.strikes < spot],
+        calls["impliedVolatility"][calls.strikes >= spot],
+    ])
+    k = np.log(strikes / spot)
+    keep = (np.abs(k) <= band) & (iv > 0)
+    if keep.sum() < 3:
+        return np.nan
+    return float(np.polyfit(k[keep], iv[keep], 1)[0])
+
+
+def _premium_volume(chain):
+    if "volume" not in chain:
+        return np.nan
+    return float(np.nansum(option_mid(chain) * np.nan_to_num(chain["volume"])))
+
+
+def scan_ticker(ticker, target_days=30, r=0.04, cache=None, now=None):
+    cache = cache or get_cache()
+    spot = cache.spot(ticker)
+    exp, T = _pick_expiry(cache.expirations(ticker), target_days, now)
+    chain = cache.option_chain(ticker, exp)
+
+    calls = chain.calls.valid("impliedVolatility", "lastPrice")
+    puts = chain.puts.valid("impliedVolatility", "lastPrice")
+    if len(calls) == 0 or len(puts) == 0:
+        raise ValueError(f"chaîne vide pour {exp}")
+
+    atm = calls.atm_strike(spot)
+    call_i, put_i = calls.loc(atm), puts.nearest_index(atm)
+    atm_iv = float(np.mean([calls["impliedVolatility"][call_i], puts["impliedVolatility"][put_i]]))
+    straddle = float(option_mid(calls)[call_i] + option_mid(puts)[put_i])
+
+    hv = _realized_vol(cache.history(ticker)["close"].to_numpy(dtype=np.float64))
+    hv_min, hv_max = np.nanmin(hv), np.nanmax(hv)
+    iv_rank = np.clip((atm_iv - hv_min) / (hv_max - hv_min), 0.0, 1.0) if hv_max > hv_min else np.nan
+
+    call_premium = _premium_volume(calls)
+    return {
+        "ticker": ticker,
+        "spot": spot,
+        "expiry": exp,
+        "days": T * 365,
+        "atm_strike": float(atm),
+        "atm_iv": atm_iv,
+        "hv30": float(hv[-1]),
+        "iv_hv_ratio": atm_iv / hv[-1] if hv[-1] > 0 else np.nan,
+        "iv_rank_hv": float(iv_rank),
+        "skew_slope": _skew_slope(calls, puts, spot),
+        "straddle": straddle,
+        "implied_move": straddle / spot,
+        "atm_call_delta": float(bs_greeks(spot, atm, T, r, atm_iv, 'call')["delta"]),
+        "put_call_premium": _premium_volume(puts) / call_premium if call_premium else np.nan,
+        "error": None,
+    }
+
+
+def _scan_safely(ticker, target_days, r, cache=None):
+    # Un ticker en erreur produit une ligne « error » au lieu d'interrompre le scan
+    try:
+        return scan_ticker(ticker, target_days, r, cache)
+    except Exception as e:
+        return {"ticker": ticker, "error": f"{type(e).__name__}: {e}"}
+
+
+def _process_worker(args):
+    return _scan_safely(*args)
+
+
+def normalize_tickers(tickers):
+    # Majuscules, sans doublon, ordre de saisie conservé
+    return list(dict.fromkeys(t.strip().upper() for t in tickers if t.strip()))
+
+
+def iter_scan(tickers, target_days=30, r=0.04, max_workers=8, processes=False, cache=None):
+    tickers = normalize_tickers(tickers)
+    if not tickers:
+        return
+
+    if processes:
+        # Chaque processus a son propre cache : réservé aux gros watchlists CPU-bound
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_process_worker, (t, target_days, r)) for t in tickers]
+            for future in as_completed(futures):
+                yield future.result()
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as pool:
+            futures = [pool.submit(_scan_safely, t, target_days, r, cache) for t in tickers]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def _as_frame(rows):
+    df = pd.DataFrame(rows).reindex(columns=list(SCAN_COLUMNS))
+    return df.astype(SCAN_COLUMNS)
+
+
+class ScanWriter:
+    # Écrit chaque résultat dès qu'il arrive : CSV en append, Parquet un row group par ticker
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.format = "parquet" if self.path.endswith(".parquet") else "csv"
+        self._writer = None
+        self._header = True
+
+    def __enter__(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        return self
+
+    def write(self, row):
+        df = _as_frame([row])
+        if self.format == "csv":
+            df.to_csv(self.path, mode="a", header=self._header, index=False)
+            self._header = False
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            schema = pa.schema([
+                (name, pa.string() if dtype == "object" else pa.float64())
+                for name, dtype in SCAN_COLUMNS.items()
+            ])
+            self._writer = pq.ParquetWriter(self.path, schema)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False))
+
+    def __exit__(self, *exc):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def run_scan(tickers, out=None, on_result=None, **kwargs):
+    rows = []
+    with ScanWriter(out) if out else nullcontext() as writer:
+        for row in iter_scan(tickers, **kwargs):
+            rows.append(row)
+            if writer is not None:
+                writer.write(row)
+            if on_result is not None:
+                on_result(row)
+    return _as_frame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scanner d'options sur une watchlist")
+    parser.add_argument("tickers", nargs="*", help="tickers à scanner")
+    parser.add_argument("--file", help="watchlist, un ticker par ligne")
+    parser.add_argument("--days", type=float, default=30, help="maturité cible en jours")
+    parser.add_argument("--rate", type=float, default=0.04, help="taux sans risque")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--processes", action="store_true", help="pool de processus au lieu de threads")
+    parser.add_argument("--out", help="fichier de sortie .csv ou .parquet")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.file:
+        with open(args.file) as f:
+            tickers += [line.split("#")[0].strip() for line in f]
+    if not tickers:
+        parser.error("aucun ticker fourni")
+
+    def report(row):
+        status = row["error"] or f"IV ATM {row['atm_iv']:.1%}"
+        print(f"{row['ticker']:<8} {status}", file=sys.stderr)
+
+    results = run_scan(
+        tickers, out=args.out, on_result=report, target_days=args.days,
+        r=args.rate, max_workers=args.workers, processes=args.processes,
+    )
+    if not args.out:
+        print(results.to_string(index=False))
+    return 0 if results["error"].isna().any() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.greeks import bs_price
+from utils.profiling import profiled
+from utils.strategies import legs_to_arrays
+
+ScenarioResult = namedtuple("ScenarioResult", ["summary", "pnl", "horizons"])
+
+# Paramètres du saut de Merton : intensité annuelle, moyenne et écart-type du log-saut
+JumpParams = namedtuple("JumpParams", ["intensity", "mean", "std"])
+
+
+def _leg_values(S, arrays, vols, remaining, r):
+    # S : (n,) -> valeur de chaque jambe (n, L) à la date d'horizon
+    K = arrays["strike"]
+    S = S[:, None]
+    intrinsic = np.where(arrays["is_call"], np.maximum(S - K, 0.0), np.maximum(K - S, 0.0))
+    if remaining > 0:
+        option_type = np.where(arrays["is_call"], 'call', 'put')
+        # IV vendeur nulle ou absente : bs_price renverrait 0, on prend la limite à vol nulle
+        # (valeur intrinsèque du forward actualisé)
+        discounted_k = K * np.exp(-r * remaining)
+        floor = np.where(arrays["is_call"], np.maximum(S - discounted_k, 0.0), np.maximum(discounted_k - S, 0.0))
+        value = np.where(vols > 0, bs_price(S, K, remaining, r, vols, option_type), floor)
+    else:
+        value = intrinsic
+    return np.where(arrays["is_stock"], S - K, value)
+
+
+def _simulate_chunk(task):
+    (seed, n_paths, spot, mu, r, sigma, horizons, expiry, arrays, vols, jump, quantity) = task
+    rng = np.random.default_rng(seed)
+    pnl = np.empty((len(horizons), n_paths), dtype=np.float32)
+    log_s = np.full(n_paths, np.log(spot))
+
+    drift = mu - 0.5 * sigma * sigma
+    if jump is not None:
+        # Compensation pour que l'espérance de S_T reste inchangée par les sauts
+        drift -= jump.intensity * (np.exp(jump.mean + 0.5 * jump.std ** 2) - 1.0)
+
+    t_prev = 0.0
+    for h, t in enumerate(horizons):
+        dt = t - t_prev
+        if dt > 0:
+            log_s += drift * dt + sigma * np.sqrt(dt) * rng.standard_normal(n_paths)
+            if jump is not None:
+                n_jumps = rng.poisson(jump.intensity * dt, n_paths)
+                log_s += n_jumps * jump.mean + np.sqrt(n_jumps) * jump.std * rng.standard_normal(n_paths)
+        t_prev = t
+
+        values = _leg_values(np.exp(log_s), arrays, vols, expiry - t, r)
+        cost = np.where(arrays["is_stock"], 0.0, arrays["premium"])
+        pnl[h] = quantity * ((values - cost) * arrays["weight"]).sum(axis=1)
+    return pnl
+
+
+@profiled()
+def simulate_strategy(legs, spot, expiry, r, sigma, horizons=None, n_paths=100_000,
+                      chunk_size=50_000, seed=0, mu=None, jump=None, leg_vols=None,
+                      quantity=1, var_level=0.95, n_workers=None):
+    # Les chunks ont chacun leur graine dérivée de `seed` : le résultat ne dépend
+    # ni de la taille du pool ni de l'ordre d'exécution.
+    horizons = np.array([expiry] if horizons is None else sorted(horizons), dtype=np.float64)
+    horizons = horizons[(horizons > 0) & (horizons <= expiry)]
+    if horizons.size == 0:
+        raise ValueError("Aucun horizon valide avant l'échéance")
+
+    arrays = legs_to_arrays(legs)
+    vols = np.full(len(legs), sigma) if leg_vols is None else np.asarray(leg_vols, dtype=np.float64)
+    mu = r if mu is None else mu
+
+    sizes = [chunk_size] * (n_paths // chunk_size)
+    if n_paths % chunk_size:
+        sizes.append(n_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (s, n, spot, mu, r, sigma, horizons, expiry, arrays, vols, jump, quantity)
+        for s, n in zip(seeds, sizes)
+    ]
+
+    if n_workers and n_workers > 1:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, tasks))
+    else:
+        chunks = [_simulate_chunk(task) for task in tasks]
+    pnl = np.concatenate(chunks, axis=1)
+
+    rows = []
+    for h, t in enumerate(horizons):
+        p = pnl[h].astype(np.float64)
+        var = -np.quantile(p, 1.0 - var_level)
+        tail = p[p <= -var]
+        rows.append({
+            "Horizon (jours)": round(t * 365, 1),
+            "Prob. de profit": float((p > 0).mean()),
+            "P&L espéré": float(p.mean()),
+            "Écart-type": float(p.std()),
+            f"VaR {var_level:.0%}": float(var),
+            f"CVaR {var_level:.0%}": float(-tail.mean()) if tail.size else float(var),
+        })
+
+    return ScenarioResult(pd.DataFrame(rows), pnl, horizons)
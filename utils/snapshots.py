@@ -0,0 +1,199 @@
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.yf_data import OptionChain, get_cache, index_chain
+
+logger = logging.getLogger(__name__)
+
+
+def _safe(value):
+    return re.sub(r"[^A-Za-z0-9._^-]", "_", str(value))
+
+
+def _to_ns(ts):
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return ts.value
+
+
+class SnapshotStore:
+    # Archive append-only des chaînes d'options, en Parquet partitionné façon Hive :
+    #   root/ticker=AAPL/expiry=2026-01-16/date=2025-06-25/<timestamp_ns>.parquet
+    # Un fichier = un snapshot. Les requêtes sélectionnent les fichiers à partir des
+    # chemins (ticker, échéance, jour, horodatage) puis lisent en memory-map
+    # uniquement les colonnes demandées.
+
+    def __init__(self, root):
+        self.root = root
+        self._spots = {}
+        self._lock = threading.Lock()
+
+    def _expiry_dir(self, ticker, exp):
+        return os.path.join(self.root, f"ticker={_safe(ticker)}", f"expiry={_safe(exp)}")
+
+    def append(self, ticker, exp, chain, spot=None, ts=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        ts = pd.Timestamp.now(tz="UTC") if ts is None else pd.Timestamp(ts)
+        ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+        df = pd.concat(
+            [chain.calls.to_frame().assign(type="call"), chain.puts.to_frame().assign(type="put")],
+            ignore_index=True,
+        )
+        df.insert(0, "snapshot_ts", ts)
+        df.insert(1, "spot", np.nan if spot is None else float(spot))
+
+        directory = os.path.join(self._expiry_dir(ticker, exp), f"date={ts.date()}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{ts.value}.parquet")
+        tmp = f"{path}.tmp"
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp)
+        os.replace(tmp, path)
+        return path
+
+    def record(self, kind, key, value):
+        # Branché sur MarketDataCache.on_fetch : le dernier spot vu est joint à chaque chaîne.
+        # L'archivage ne doit jamais faire échouer un fetch réussi (pyarrow lève aussi
+        # ArrowTypeError / ArrowInvalid sur des colonnes de types mélangés)
+        try:
+            if kind == "spot":
+                with self._lock:
+                    self._spots[key[0]] = value
+            elif kind == "chain":
+                ticker, exp = key
+                with self._lock:
+                    spot = self._spots.get(ticker)
+                self.append(ticker, exp, value, spot)
+        except Exception as e:
+            logger.warning("Snapshot non archivé (%s %s) : %s", kind, key, e)
+
+    def tickers(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d.split("=", 1)[1] for d in os.listdir(self.root) if d.startswith("ticker="))
+
+    def expirations(self, ticker):
+        directory = os.path.join(self.root, f"ticker={_safe(ticker)}")
+        if not os.path.isdir(directory):
+            return ()
+        return tuple(sorted(d.split("=", 1)[1] for d in os.listdir(directory) if d.startswith("expiry=")))
+
+    def _files(self, ticker, exp, start=None, end=None):
+        start_ns, end_ns = _to_ns(start), _to_ns(end)
+        start_day = None if start is None else str(pd.Timestamp(start_ns, tz="UTC").date())
+        end_day = None if end is None else str(pd.Timestamp(end_ns, tz="UTC").date())
+
+        directory = self._expiry_dir(ticker, exp)
+        if not os.path.isdir(directory):
+            return []
+        files = []
+        for day_dir in sorted(os.listdir(directory)):
+            day = day_dir.split("=", 1)[-1]
+            # Élagage par partition jour avant de lister les fichiers
+            if (start_day and day < start_day) or (end_day and day > end_day):
+                continue
+            for name in os.listdir(os.path.join(directory, day_dir)):
+                if not name.endswith(".parquet"):
+                    continue
+                ts = int(name[:-len(".parquet")])
+                if (start_ns is None or ts >= start_ns) and (end_ns is None or ts <= end_ns):
+                    files.append((ts, os.path.join(directory, day_dir, name)))
+        return sorted(files)
+
+    def snapshot_times(self, ticker, exp, start=None, end=None):
+        return [pd.Timestamp(ts, tz="UTC") for ts, _ in self._files(ticker, exp, start, end)]
+
+    def query(self, ticker, expiries=None, start=None, end=None, columns=None):
+        import pyarrow.parquet as pq
+
+        expiries = self.expirations(ticker) if expiries is None else expiries
+        if isinstance(expiries, str):
+            expiries = [expiries]
+        frames = []
+        for exp in expiries:
+            for _, path in self._files(ticker, exp, start, end):
+                table = pq.read_table(path, columns=columns, memory_map=True)
+                frames.append(table.to_pandas().assign(ticker=ticker, expiry=exp))
+        if not frames:
+            return pd.DataFrame(columns=list(columns or []) + ["ticker", "expiry"])
+        return pd.concat(frames, ignore_index=True)
+
+    def load_snapshot(self, ticker, exp, at=None):
+        # Dernier snapshot antérieur ou égal à `at` (le plus récent si at est None)
+        import pyarrow.parquet as pq
+
+        files = self._files(ticker, exp, end=at)
+        if not files:
+            raise LookupError(f"Aucun snapshot pour {ticker} {exp}")
+        df = pq.read_table(files[-1][1], memory_map=True).to_pandas()
+        side = df.pop("type")
+        spot = df.pop("spot").iloc[0]
+        df = df.drop(columns="snapshot_ts")
+        chain = index_chain(OptionChain(df[side == "call"], df[side == "put"], None))
+        return chain, (None if pd.isna(spot) else float(spot))
+
+    def iter_snapshots(self, ticker, exp, start=None, end=None):
+        for ts, _ in self._files(ticker, exp, start, end):
+            chain, spot = self.load_snapshot(ticker, exp, pd.Timestamp(ts, tz="UTC"))
+            yield pd.Timestamp(ts, tz="UTC"), chain, spot
+
+
+class ReplayProvider:
+    # Source de données hors ligne pour MarketDataCache : rejoue les snapshots
+    # au lieu d'appeler yfinance. `at` fige l'horloge de replay (None = dernier état) ;
+    # les échéances d'un même refresh sont archivées à quelques secondes d'écart,
+    # `tolerance` les rattache au même instant.
+
+    def __init__(self, store, at=None, tolerance=pd.Timedelta(minutes=1), latency=0.0):
+        self.store = store
+        self.at = None if at is None else pd.Timestamp(at) + tolerance
+        self.latency = latency
+
+    def expirations(self, ticker):
+        return self.store.expirations(ticker)
+
+    def option_chain(self, ticker, exp):
+        time.sleep(self.latency)
+        return self.store.load_snapshot(ticker, exp, self.at)[0]
+
+    def spot(self, ticker):
+        for exp in self.store.expirations(ticker):
+            try:
+                spot = self.store.load_snapshot(ticker, exp, self.at)[1]
+            except LookupError:
+                continue
+            if spot is not None:
+                return spot
+        raise LookupError(f"Aucun spot archivé pour {ticker}")
+
+    def history(self, ticker, period="1y"):
+        df = self.store.query(ticker, end=self.at, columns=["snapshot_ts", "spot"]).dropna(subset=["spot"])
+        closes = df.set_index("snapshot_ts")["spot"].sort_index().resample("1D").last().dropna()
+        return pd.DataFrame({"close": closes.to_numpy()}, index=closes.index.tz_localize(None).rename("date"))
+
+
+_store = None
+
+
+def get_snapshot_store(root=None):
+    # Activé par OPTIONS_DASHBOARD_SNAPSHOT_DIR : chaque chaîne fetchée est archivée
+    global _store
+    root = root or os.environ.get("OPTIONS_DASHBOARD_SNAPSHOT_DIR")
+    if root is None:
+        return None
+    if _store is None or _store.root != root:
+        _store = SnapshotStore(root)
+    cache = get_cache()
+    if cache.on_fetch is None and not isinstance(cache.provider, ReplayProvider):
+        cache.on_fetch = _store.record
+    return _store
@@ -0,0 +1,150 @@
+from collections import namedtuple
+
+import numpy as np
+
+from utils.profiling import profiled
+
+# kind : 'call', 'put' ou 'stock' (pour le sous-jacent, strike = prix d'entrée)
+# side : +1 achat, -1 vente
+Leg = namedtuple("Leg", ["kind", "strike", "side", "qty", "premium"], defaults=(1, 0.0))
+
+# Modèles de stratégies : (kind, side, qty, libellé du slider, position par défaut dans la liste des strikes)
+STRATEGY_TEMPLATES = {
+    "Long Call": [("call", 1, 1, "Strike", 0.5)],
+    "Long Put": [("put", 1, 1, "Strike", 0.5)],
+    "Short Call": [("call", -1, 1, "Strike", 0.5)],
+    "Short Put": [("put", -1, 1, "Strike", 0.5)],
+    "Bull Call Spread": [
+        ("call", 1, 1, "Strike Long Call", 0.0),
+        ("call", -1, 1, "Strike Short Call", 1.0),
+    ],
+    "Strangle": [
+        ("call", 1, 1, "Strike Call (achat)", 0.0),
+        ("put", 1, 1, "Strike Put (achat)", 0.0),
+    ],
+    "Covered Call": [
+        ("stock", 1, 1, None, None),
+        ("call", -1, 1, "Strike Call (vente)", 0.0),
+    ],
+    "Bear Call Spread": [
+        ("call", -1, 1, "Strike Call (vente)", 0.0),
+        ("call", 1, 1, "Strike Call (achat)", 0.0),
+    ],
+    "Bear Put Spread": [
+        ("put", 1, 1, "Strike Put (achat)", 0.0),
+        ("put", -1, 1, "Strike Put (vente)", 0.0),
+    ],
+    "Bull Put Spread": [
+        ("put", -1, 1, "Strike Put (vente)", 0.0),
+        ("put", 1, 1, "Strike Put (achat)", 0.0),
+    ],
+    "Iron Condor": [
+        ("put", 1, 1, "Strike Put (achat)", 0.2),
+        ("put", -1, 1, "Strike Put (vente)", 0.4),
+        ("call", -1, 1, "Strike Call (vente)", 0.6),
+        ("call", 1, 1, "Strike Call (achat)", 0.8),
+    ],
+    "Butterfly Call": [
+        ("call", 1, 1, "Strike Call bas (achat)", 0.3),
+        ("call", -1, 2, "Strike Call central (vente x2)", 0.5),
+        ("call", 1, 1, "Strike Call haut (achat)", 0.7),
+    ],
+    "Ratio Call Spread": [
+        ("call", 1, 1, "Strike Call (achat)", 0.4),
+        ("call", -1, 2, "Strike Call (vente x2)", 0.6),
+    ],
+}
+
+
+def legs_to_arrays(legs):
+    kind = np.array([leg.kind for leg in legs])
+    return {
+        "strike": np.array([leg.strike for leg in legs], dtype=np.float64),
+        "weight": np.array([leg.side * leg.qty for leg in legs], dtype=np.float64),
+        "premium": np.array([leg.premium for leg in legs], dtype=np.float64),
+        "is_call": kind == "call",
+        "is_stock": kind == "stock",
+    }
+
+
+def payoff_matrix(strike, weight, premium, is_call, is_stock, prices):
+    # strike/weight/premium : (..., L) ; prices : (N,) -> P&L à l'échéance (..., N)
+    K = np.asarray(strike, dtype=np.float64)[..., None]
+    S = np.asarray(prices, dtype=np.float64)
+    is_call = np.asarray(is_call)[..., None]
+    is_stock = np.asarray(is_stock)[..., None]
+
+    intrinsic = np.where(
+        is_stock,
+        S - K,
+        np.maximum(np.where(is_call, S - K, K - S), 0.0),
+    )
+    pnl = np.asarray(weight)[..., None] * (intrinsic - np.asarray(premium)[..., None])
+    return pnl.sum(axis=-2)
+
+
+def _kink_values(strike, weight, premium, is_call, is_stock):
+    # Le payoff est linéaire par morceaux : ses extrema sont en 0, aux strikes ou à l'infini
+    strike = np.asarray(strike, dtype=np.float64)
+    weight = np.asarray(weight, dtype=np.float64)
+    is_call = np.asarray(is_call)
+    is_stock = np.asarray(is_stock)
+
+    points = np.concatenate([np.zeros(strike.shape[:-1] + (1,)), strike], axis=-1)
+    K = strike[..., None, :]
+    S = points[..., :, None]
+    intrinsic = np.where(
+        is_stock[..., None, :],
+        S - K,
+        np.maximum(np.where(is_call[..., None, :], S - K, K - S), 0.0),
+    )
+    pnl = weight[..., None, :] * (intrinsic - np.asarray(premium)[..., None, :])
+    right_slope = (weight * (is_call | is_stock)).sum(axis=-1)
+    return points, pnl.sum(axis=-1), right_slope
+
+
+def pnl_extrema(strike, weight, premium, is_call, is_stock):
+    _, values, right_slope = _kink_values(strike, weight, premium, is_call, is_stock)
+    pnl_max = np.where(right_slope > 0, np.inf, values.max(axis=-1))
+    pnl_min = np.where(right_slope < 0, -np.inf, values.min(axis=-1))
+    return pnl_max, pnl_min
+
+
+def breakevens(legs):
+    arrays = legs_to_arrays(legs)
+    points, values, right_slope = _kink_values(**arrays)
+    order = np.argsort(points, kind="stable")
+    points, values = points[order], values[order]
+
+    roots = []
+    for a, b, va, vb in zip(points[:-1], points[1:], values[:-1], values[1:]):
+        if va == 0:
+            roots.append(a)
+        elif va * vb < 0:
+            roots.append(a - va * (b - a) / (vb - va))
+    if values[-1] == 0:
+        roots.append(points[-1])
+    elif values[-1] * right_slope < 0:
+        roots.append(points[-1] - values[-1] / right_slope)
+
+    return sorted({round(float(r), 10) for r in roots if r > 0})
+
+
+def net_premium(legs):
+    return sum(leg.side * leg.qty * leg.premium for leg in legs if leg.kind != "stock")
+
+
+@profiled()
+def strategy_payoff(legs, prices, quantity=1):
+    return quantity * payoff_matrix(prices=prices, **legs_to_arrays(legs))
+
+
+@profiled()
+def strategy_summary(legs, quantity=1):
+    pnl_max, pnl_min = pnl_extrema(**legs_to_arrays(legs))
+    return {
+        "breakevens": breakevens(legs),
+        "pnl_max": quantity * float(pnl_max),
+        "pnl_min": quantity * float(pnl_min),
+        "net_premium": net_premium(legs),
+    }
@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.greeks import bs_greeks, time_to_expiry
+from utils.profiling import profiled
+
+SURFACE_CACHE_SIZE = 32
+
+
+def svi_total_variance(params, k):
+    # SVI « raw » : w(k) = a + b (rho (k - m) + sqrt((k - m)^2 + sigma^2))
+    a, b, rho, m, sigma = np.moveaxis(np.asarray(params), -1, 0)
+    a, b, rho, m, sigma = (p[..., None] for p in (a, b, rho, m, sigma))
+    x = k - m
+    return a + b * (rho * x + np.sqrt(x * x + sigma * sigma))
+
+
+def fit_svi(k, w):
+    # scipy.optimize (~0,5 s d'import) n'est chargé qu'au premier fit
+    from scipy.optimize import least_squares
+
+    k = np.asarray(k, dtype=np.float64)
+    w = np.asarray(w, dtype=np.float64)
+    x0 = [max(w.min() * 0.5, 1e-6), 0.1, -0.3, 0.0, 0.1]
+    bounds = ([-w.max(), 0.0, -0.999, -2.0, 1e-4], [w.max() * 2, 5.0, 0.999, 2.0, 5.0])
+
+    def residuals(params):
+        return svi_total_variance(params, k) - w
+
+    fit = least_squares(residuals, x0, bounds=bounds, method="trf", x_scale="jac")
+    return fit.x, float(np.sqrt(np.mean(fit.fun ** 2)))
+
+
+def _otm_slice(df, forward):
+    # Puts sous le forward, calls au-dessus : ce sont les cotations les plus liquides
+    otm = ((df["type"] == "put") & (df["strike"] < forward)) | ((df["type"] == "call") & (df["strike"] >= forward))
+    return df[otm]
+
+
+class VolSurface:
+    # Surface de volatilité strike x échéance : une paramétrisation SVI par échéance,
+    # interpolée linéairement en variance totale entre les échéances.
+
+    def __init__(self, spot, r, T, params, rmse, expiries):
+        self.spot = spot
+        self.r = r
+        self.T = np.asarray(T, dtype=np.float64)
+        self.params = np.asarray(params, dtype=np.float64)
+        self.rmse = np.asarray(rmse, dtype=np.float64)
+        self.expiries = list(expiries)
+
+    @classmethod
+    def fit(cls, surface_df, spot, r, now=None, min_points=5, max_abs_k=1.5):
+        df = surface_df.dropna(subset=["strike", "impliedVolatility"])
+        df = df[df["impliedVolatility"] > 0]
+
+        T, params, rmse, expiries = [], [], [], []
+        for exp, slice_df in df.groupby("expiry", sort=True):
+            t = time_to_expiry(exp, now)
+            if t <= 0:
+                continue
+            forward = spot * np.exp(r * t)
+            slice_df = _otm_slice(slice_df, forward)
+            k = np.log(slice_df["strike"].to_numpy(dtype=np.float64) / forward)
+            w = slice_df["impliedVolatility"].to_numpy(dtype=np.float64) ** 2 * t
+            keep = np.abs(k) <= max_abs_k
+            if keep.sum() < min_points:
+                continue
+            p, err = fit_svi(k[keep], w[keep])
+            T.append(t)
+            params.append(p)
+            rmse.append(err)
+            expiries.append(exp)
+
+        if not T:
+            raise ValueError("Pas assez de points pour ajuster la surface de volatilité")
+        return cls(spot, r, T, params, rmse, expiries)
+
+    def total_variance(self, K, T):
+        K, T = np.broadcast_arrays(np.asarray(K, dtype=np.float64), np.asarray(T, dtype=np.float64))
+        k = np.log(K / (self.spot * np.exp(self.r * T)))
+
+        # Variance totale de chaque tranche au même log-moneyness forward : (n_slices, n_requêtes)
+        w_slices = np.maximum(svi_total_variance(self.params, k.ravel()), 1e-12)
+
+        i = np.clip(np.searchsorted(self.T, T.ravel()), 1, max(len(self.T) - 1, 1))
+        if len(self.T) == 1:
+            w = w_slices[0] * T.ravel() / self.T[0]
+        else:
+            cols = np.arange(k.size)
+            t0, t1 = self.T[i - 1], self.T[i]
+            w0, w1 = w_slices[i - 1, cols], w_slices[i, cols]
+            w = w0 + (w1 - w0) * (T.ravel() - t0) / (t1 - t0)
+            # Au-delà des échéances cotées : volatilité constante
+            w = np.where(T.ravel() < self.T[0], w_slices[0] * T.ravel() / self.T[0], w)
+            w = np.where(T.ravel() > self.T[-1], w_slices[-1] * T.ravel() / self.T[-1], w)
+        return np.maximum(w, 0.0).reshape(K.shape)
+
+    def vol(self, K, T):
+        T = np.asarray(T, dtype=np.float64)
+        w = self.total_variance(K, T)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(T > 0, np.sqrt(w / T), np.nan)
+
+    def greeks(self, K, T, option_type='call'):
+        return bs_greeks(self.spot, K, T, self.r, self.vol(K, T), option_type)
+
+    def grid(self, moneyness=None, T=None):
+        moneyness = np.linspace(0.7, 1.3, 41) if moneyness is None else np.asarray(moneyness)
+        T = np.linspace(self.T[0], self.T[-1], 30) if T is None else np.asarray(T)
+        KK, TT = np.meshgrid(self.spot * moneyness, T)
+        return moneyness, T, self.vol(KK, TT)
+
+
+_surface_cache = OrderedDict()
+# Partagé par les threads de script Streamlit : get/move_to_end et insert/popitem sous verrou
+_surface_cache_lock = threading.Lock()
+
+
+def snapshot_key(surface_df, columns=("expiry", "type", "strike", "impliedVolatility")):
+    cols = [c for c in columns if c in surface_df]
+    return int(pd.util.hash_pandas_object(surface_df[cols], index=False).sum())
+
+
+@profiled()
+def get_vol_surface(ticker, surface_df, spot, r, snapshot=None, now=None):
+    # Les paramètres ajustés sont mis en cache par (ticker, snapshot, spot, r, now) :
+    # un rerun Streamlit sur les mêmes données ne refait pas le fit. `now` fixe la date en replay.
+    snapshot = snapshot_key(surface_df) if snapshot is None else snapshot
+    key = (ticker, snapshot, float(spot), float(r), now)
+    with _surface_cache_lock:
+        surface = _surface_cache.get(key)
+        if surface is not None:
+            _surface_cache.move_to_end(key)
+            return surface
+
+    # Le fit tourne hors du verrou pour ne pas bloquer les autres sessions
+    surface = VolSurface.fit(surface_df, spot, r, now)
+    with _surface_cache_lock:
+        _surface_cache[key] = surface
+        while len(_surface_cache) > SURFACE_CACHE_SIZE:
+            _surface_cache.popitem(last=False)
+    return surface
@@ -1,24 +1,205 @@
+import copy
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
+
 import plotly.graph_objects as go
-import plotly.express as px
 import numpy as np
 import pandas as pd
-from scipy.stats import norm
-from math import log, sqrt, exp
+from utils.chain import StrikeChain, as_strike_chain
+from utils.greeks import bs_greeks
+from utils.profiling import profiled
+
+# Au-delà de ce nombre de points, les traces passent en WebGL (Scattergl)
+SCATTERGL_THRESHOLD = 1000
+FIGURE_CACHE_SIZE = 64
+HEATMAP_STRIKE_BINS = 60
+HEATMAP_IV_BINS = 40
+
+_figure_cache = OrderedDict()
+_figure_cache_lock = threading.Lock()
+
+
+def _update_digest(h, obj, columns=None):
+    # columns : seules ces colonnes des chaînes / DataFrames entrent dans la clé
+    # (les colonnes objet comme contractSymbol coûtent cher à hasher et ne sont pas tracées)
+    if isinstance(obj, StrikeChain):
+        for name in obj.columns:
+            if columns is None or name in columns:
+                h.update(name.encode())
+                _update_digest(h, obj[name])
+    elif isinstance(obj, pd.DataFrame):
+        if columns is not None:
+            obj = obj[[name for name in obj.columns if name in columns]]
+        h.update(repr(list(obj.columns)).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, pd.Series):
+        h.update(repr(obj.name).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            h.update(repr(obj.tolist()).encode())
+        else:
+            h.update(str(obj.dtype).encode() + str(obj.shape).encode())
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (tuple, list)):
+        h.update(f"{type(obj).__name__}{len(obj)}".encode())
+        for item in obj:
+            _update_digest(h, item, columns)
+    else:
+        h.update(repr(obj).encode())
+
+
+def memoized_figure(fn=None, columns=None):
+    # Les figures sont reconstruites seulement si les données d'entrée changent :
+    # la clé est un hash du contenu (chaîne, arrays, paramètres), pas de l'identité des objets.
+    # Chaque appel reçoit sa propre figure : un update_layout de l'appelant ne touche pas le cache.
+    if fn is None:
+        return functools.partial(memoized_figure, columns=columns)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        h = hashlib.blake2b(fn.__qualname__.encode(), digest_size=16)
+        _update_digest(h, args, columns)
+        _update_digest(h, sorted(kwargs.items()), columns)
+        key = h.hexdigest()
+
+        with _figure_cache_lock:
+            spec = _figure_cache.get(key)
+            if spec is not None:
+                _figure_cache.move_to_end(key)
+
+        if spec is None:
+            spec = fn(*args, **kwargs).to_dict()
+            with _figure_cache_lock:
+                _figure_cache[key] = spec
+                while len(_figure_cache) > FIGURE_CACHE_SIZE:
+                    _figure_cache.popitem(last=False)
+        # Le cache garde le dict de la figure ; spec déjà validé à la construction,
+        # la revalidation plotly coûterait ~15 ms par figure
+        return go.Figure(copy.deepcopy(spec), _validate=False)
+
+    return wrapper
+
+
+def _scatter(n_points, **kwargs):
+    trace = go.Scattergl if n_points > SCATTERGL_THRESHOLD else go.Scatter
+    return trace(**kwargs)
+
+
+def _bin_edges(values, max_bins):
+    lo, hi = float(values.min()), float(values.max())
+    n_bins = max(min(max_bins, len(np.unique(values))), 1)
+    if hi <= lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    return np.linspace(lo, hi, n_bins + 1)
+
+
+def binned_grid(x, y, z, x_bins=HEATMAP_STRIKE_BINS, y_bins=HEATMAP_IV_BINS):
+    # Moyenne de z par cellule d'une grille dense (y, x) fixe, au lieu d'un pivot
+    # sur les valeurs brutes qui produit une matrice creuse de taille n x n.
+    x, y, z = (np.asarray(v, dtype=np.float64) for v in (x, y, z))
+    x_edges = _bin_edges(x, x_bins)
+    y_edges = _bin_edges(y, y_bins)
+    sums, _, _ = np.histogram2d(y, x, bins=[y_edges, x_edges], weights=z)
+    counts, _, _ = np.histogram2d(y, x, bins=[y_edges, x_edges])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        grid = np.where(counts > 0, sums / counts, np.nan)
+    return (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2, grid
+
+
+class IncrementalGrid:
+    # Même grille que binned_grid, mais tenue à jour contrat par contrat : chaque
+    # contrat contribue (somme, compte) à une cellule, qu'on retire puis réajoute
+    # quand sa cotation change. Les bornes en y sont élargies de `pad` pour que
+    # les petits mouvements d'IV restent dans la grille sans reconstruction.
+
+    def __init__(self, x, y, z, x_bins=HEATMAP_STRIKE_BINS, y_bins=HEATMAP_IV_BINS, pad=0.1):
+        x, y = (np.asarray(v, dtype=np.float64) for v in (x, y))
+        self.x_edges = _bin_edges(x, x_bins)
+        lo, hi = float(y.min()), float(y.max())
+        margin = pad * (hi - lo) if hi > lo else 0.5
+        n_bins = max(min(y_bins, len(np.unique(y))), 1)
+        self.y_edges = np.linspace(lo - margin, hi + margin, n_bins + 1)
+        self.shape = (len(self.y_edges) - 1, len(self.x_edges) - 1)
+        self.sums = np.zeros(self.shape[0] * self.shape[1])
+        self.counts = np.zeros_like(self.sums)
+        self.add(self.locate(x, y), z)
+
+    @staticmethod
+    def _bin(values, edges):
+        i = np.searchsorted(edges, values, side="right") - 1
+        # Dernière arête incluse, comme np.histogram2d
+        i = np.where(values == edges[-1], len(edges) - 2, i)
+        return np.where((values >= edges[0]) & (values <= edges[-1]), i, -1)
+
+    def locate(self, x, y):
+        ix = self._bin(np.asarray(x, dtype=np.float64), self.x_edges)
+        iy = self._bin(np.asarray(y, dtype=np.float64), self.y_edges)
+        return np.where((ix >= 0) & (iy >= 0), iy * self.shape[1] + ix, -1)
+
+    def add(self, cells, z, sign=1.0):
+        cells = np.asarray(cells)
+        inside = cells >= 0
+        np.add.at(self.sums, cells[inside], sign * np.asarray(z, dtype=np.float64)[inside])
+        np.add.at(self.counts, cells[inside], sign)
 
+    def remove(self, cells, z):
+        self.add(cells, z, -1.0)
+
+    def grid(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            values = np.where(self.counts > 0.5, self.sums / self.counts, np.nan)
+        x_centers = (self.x_edges[:-1] + self.x_edges[1:]) / 2
+        y_centers = (self.y_edges[:-1] + self.y_edges[1:]) / 2
+        return x_centers, y_centers, values.reshape(self.shape)
+
+
+def _heatmap_figure(x_centers, y_centers, grid, x_title, y_title, z_title, title):
+    fig = go.Figure()
+    if len(x_centers):
+        fig.add_trace(go.Heatmap(
+            x=np.round(x_centers, 2),
+            y=np.round(y_centers, 3),
+            z=grid.astype(np.float32),
+            colorbar=dict(title=z_title),
+            hoverongaps=False
+        ))
+
+    fig.update_layout(
+        title=title,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        template='plotly_white'
+    )
+
+    return fig
+
+
+def _binned_heatmap(x, y, z, x_title, y_title, z_title, title):
+    if not len(x):
+        return _heatmap_figure((), (), None, x_title, y_title, z_title, title)
+    return _heatmap_figure(*binned_grid(x, y, z), x_title, y_title, z_title, title)
+
+@profiled()
+@memoized_figure(columns=("strike", "impliedVolatility"))
 def plot_iv_smile(option_chain):
-    calls = option_chain.calls.dropna(subset=['impliedVolatility', 'strike'])
-    puts = option_chain.puts.dropna(subset=['impliedVolatility', 'strike'])
+    calls = as_strike_chain(option_chain.calls).valid('impliedVolatility')
+    puts = as_strike_chain(option_chain.puts).valid('impliedVolatility')
 
     fig = go.Figure()
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(_scatter(
+        len(calls),
         x=calls['strike'],
         y=calls['impliedVolatility'],
         mode='lines+markers',
         name='Calls IV'
     ))
 
-    fig.add_trace(go.Scatter(
+    fig.add_trace(_scatter(
+        len(puts),
         x=puts['strike'],
         y=puts['impliedVolatility'],
         mode='lines+markers',
@@ -34,22 +215,146 @@ def plot_iv_smile(option_chain):
 
     return fig
 
+@profiled()
+@memoized_figure
+def plot_term_structure(atm_iv):
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=atm_iv.index,
+        y=atm_iv.values,
+        mode='lines+markers',
+        name='IV ATM'
+    ))
+
+    fig.update_layout(
+        title='Structure par Terme (IV ATM vs Échéance)',
+        xaxis_title='Échéance',
+        yaxis_title='Implied Volatility',
+        template='plotly_white'
+    )
+
+    return fig
+
+@profiled()
+@memoized_figure
+def plot_vol_surface(moneyness, T, vols):
+    fig = go.Figure(data=[go.Surface(
+        x=moneyness,
+        y=T * 365,
+        z=vols,
+        colorscale='Viridis',
+        colorbar=dict(title='IV')
+    )])
+
+    fig.update_layout(
+        title='Surface de Volatilité (Moneyness x Maturité)',
+        scene=dict(
+            xaxis_title='Moneyness (K/S)',
+            yaxis_title='Maturité (jours)',
+            zaxis_title='Implied Volatility'
+        ),
+        template='plotly_white'
+    )
+
+    return fig
+
+@profiled()
+@memoized_figure
+def plot_pnl_distribution(pnl, bins=100):
+    # Histogramme pré-calculé : on n'envoie au navigateur que les barres, pas les trajectoires
+    counts, edges = np.histogram(pnl, bins=bins)
+    centers = (edges[:-1] + edges[1:]) / 2
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=centers,
+        y=counts / counts.sum(),
+        marker_color=np.where(centers >= 0, 'seagreen', 'indianred'),
+        name='P&L'
+    ))
+
+    fig.update_layout(
+        title="Distribution du P&L à l'échéance",
+        xaxis_title='Profit / Perte ($)',
+        yaxis_title='Probabilité',
+        bargap=0,
+        template='plotly_white'
+    )
+
+    return fig
+
+@profiled()
+@memoized_figure(columns=("strike", "impliedVolatility", "lastPrice"))
 def plot_option_price_heatmap(df, option_type='call'):
-    df = df.dropna(subset=['impliedVolatility', 'strike', 'lastPrice'])
-    heatmap_data = df.pivot_table(index='impliedVolatility', columns='strike', values='lastPrice')
-    heatmap_data = heatmap_data.sort_index(ascending=True)
-
-    fig = px.imshow(
-        heatmap_data.values,
-        labels=dict(x='Strike', y='Implied Volatility', color='Prix'),
-        x=heatmap_data.columns,
-        y=np.round(heatmap_data.index, 2),
-        aspect='auto',
-        title=f'Heatmap des Prix {option_type.capitalize()} (Strike vs IV)'
+    chain = as_strike_chain(df).valid('impliedVolatility', 'lastPrice')
+
+    return _binned_heatmap(
+        chain['strike'],
+        chain['impliedVolatility'],
+        chain['lastPrice'],
+        'Strike',
+        'Implied Volatility',
+        'Prix',
+        f'Heatmap des Prix {option_type.capitalize()} (Strike vs IV)'
+    )
+
+@profiled()
+def plot_option_price_grid(grid, option_type='call'):
+    # Variante live : la grille est déjà agrégée (IncrementalGrid), pas de binning ici
+    return _heatmap_figure(
+        *(grid.grid() if grid is not None else ((), (), None)),
+        'Strike',
+        'Implied Volatility',
+        'Prix',
+        f'Heatmap des Prix {option_type.capitalize()} (Strike vs IV)'
+    )
+
+@profiled()
+@memoized_figure
+def plot_strategy_payoff(x, payoff):
+    fig = go.Figure()
+    fig.add_trace(_scatter(len(x), x=x, y=payoff, fill='tozeroy', mode='lines'))
+    fig.update_layout(title="Payoff à l'échéance", xaxis_title="Prix du sous-jacent", yaxis_title="Profit / Perte ($)")
+    return fig
+
+@profiled()
+@memoized_figure(columns=("strike", "gamma"))
+def plot_gamma_exposure(by_strike, profile, spot, gamma_flip=None):
+    # Barres : GEX nette par strike ; courbe : GEX totale si le spot était à ce niveau
+    lo, hi = profile.index.min(), profile.index.max()
+    band = by_strike[(by_strike["strike"] >= lo) & (by_strike["strike"] <= hi)]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=band["strike"],
+        y=band["gamma"],
+        marker_color=np.where(band["gamma"] >= 0, 'seagreen', 'indianred'),
+        name='GEX par strike'
+    ))
+    fig.add_trace(go.Scatter(
+        x=profile.index,
+        y=profile.values,
+        mode='lines',
+        name='GEX totale (profil)',
+        yaxis='y2'
+    ))
+    fig.add_vline(x=spot, line_dash='dot', line_color='gray', annotation_text='Spot')
+    if gamma_flip is not None:
+        fig.add_vline(x=gamma_flip, line_dash='dash', line_color='orange', annotation_text='Gamma flip')
+
+    fig.update_layout(
+        title='Exposition Gamma des Dealers ($ par 1 % de mouvement)',
+        xaxis_title='Strike',
+        yaxis_title='GEX par strike ($)',
+        yaxis2=dict(title='GEX totale ($)', overlaying='y', side='right', showgrid=False),
+        legend=dict(orientation='h'),
+        template='plotly_white'
     )
 
     return fig
 
+@profiled()
 def plot_payoff_chart(option_type, direction, strike, premium):
     import numpy as np
     import plotly.graph_objects as go
@@ -84,49 +389,38 @@ def plot_payoff_chart(option_type, direction, strike, premium):
     )
     return fig
 
-def compute_greeks(df, S, T, r):
-    result = []
-
-    for _, row in df.dropna(subset=['strike', 'impliedVolatility']).iterrows():
-        K = row['strike']
-        sigma = row['impliedVolatility']
-        if sigma == 0:
-            continue
-        d1 = (log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * sqrt(T))
-        d2 = d1 - sigma * sqrt(T)
-
-        delta = norm.cdf(d1)
-        gamma = norm.pdf(d1) / (S * sigma * sqrt(T))
-        vega = S * norm.pdf(d1) * sqrt(T) / 100
-        theta = (-S * norm.pdf(d1) * sigma / (2 * sqrt(T)) - r * K * exp(-r * T) * norm.cdf(d2)) / 365
-        rho = K * T * exp(-r * T) * norm.cdf(d2) / 100
+@profiled()
+def compute_greeks(df, S, T, r, option_type='call'):
+    chain = as_strike_chain(df).valid('impliedVolatility')
+    nonzero = chain['impliedVolatility'] != 0
 
-        result.append({
-            "Strike": K,
-            "IV": sigma,
-            "Delta": delta,
-            "Gamma": gamma,
-            "Vega": vega,
-            "Theta": theta,
-            "Rho": rho
-        })
+    K = chain['strike'][nonzero]
+    sigma = chain['impliedVolatility'][nonzero]
+    greeks = bs_greeks(S, K, T, r, sigma, option_type)
 
-    return pd.DataFrame(result)
+    return pd.DataFrame({
+        "Strike": K,
+        "IV": sigma,
+        "Delta": greeks["delta"],
+        "Gamma": greeks["gamma"],
+        "Vega": greeks["vega"],
+        "Theta": greeks["theta"],
+        "Rho": greeks["rho"]
+    })
 
 
+@profiled()
+@memoized_figure(columns=("Strike", "IV", "Delta", "Gamma", "Vega", "Theta", "Rho"))
 def plot_greek_heatmap(df, greek="Delta"):
     df = df.dropna(subset=["Strike", "IV", greek])
     df = df[df["IV"] > 0]
 
-    heatmap_data = df.pivot_table(index="IV", columns="Strike", values=greek)
-
-    fig = px.imshow(
-        heatmap_data.values,
-        labels=dict(x="Strike", y="IV", color=greek),
-        x=heatmap_data.columns,
-        y=[round(v, 3) for v in heatmap_data.index],
-        aspect="auto",
-        title=f"Heatmap du {greek} (Strike vs IV)"
+    return _binned_heatmap(
+        df["Strike"].to_numpy(),
+        df["IV"].to_numpy(),
+        df[greek].to_numpy(),
+        "Strike",
+        "IV",
+        greek,
+        f"Heatmap du {greek} (Strike vs IV)"
     )
-
-    return fig
\ No newline at end of file
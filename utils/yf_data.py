@@ -1,18 +1,319 @@
-import yfinance as yf
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
 import streamlit as st
 
+from utils.chain import StrikeChain, as_strike_chain
+from utils.profiling import profiled
+
+OptionChain = namedtuple("OptionChain", ["calls", "puts", "underlying"])
+
+DEFAULT_TTL = {
+    "expirations": 3600.0,
+    "chain": 60.0,
+    "spot": 15.0,
+    "history": 3600.0,
+}
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+
+
+class YFinanceProvider:
+    @staticmethod
+    def _ticker(ticker):
+        # Import différé : yfinance coûte ~0,2 s au démarrage et n'est utile qu'au premier fetch
+        import yfinance as yf
+        return yf.Ticker(ticker)
+
+    def expirations(self, ticker):
+        return tuple(self._ticker(ticker).options)
+
+    def option_chain(self, ticker, exp):
+        chain = self._ticker(ticker).option_chain(exp)
+        return OptionChain(chain.calls, chain.puts, getattr(chain, "underlying", None))
+
+    def spot(self, ticker):
+        return float(self._ticker(ticker).history(period="1d")["Close"].iloc[-1])
+
+    def history(self, ticker, period="1y"):
+        closes = self._ticker(ticker).history(period=period)["Close"]
+        return pd.DataFrame({"close": closes.to_numpy(dtype=float)}, index=closes.index.tz_localize(None))
+
+
+def index_chain(chain):
+    # Les chaînes sont indexées par strike une seule fois, au moment du fetch
+    return OptionChain(as_strike_chain(chain.calls), as_strike_chain(chain.puts), chain.underlying)
+
+
+def _sizeof(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, StrikeChain):
+        return value.nbytes
+    if isinstance(value, OptionChain):
+        return _sizeof(value.calls) + _sizeof(value.puts)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def _to_frame(kind, value):
+    if kind == "chain":
+        return pd.concat(
+            [value.calls.to_frame().assign(_side="calls"), value.puts.to_frame().assign(_side="puts")],
+            ignore_index=True,
+        )
+    if kind == "expirations":
+        return pd.DataFrame({"expiration": list(value)})
+    if kind == "history":
+        return value.rename_axis("date").reset_index()
+    return pd.DataFrame({"spot": [value]})
+
+
+def _from_frame(kind, df):
+    if kind == "chain":
+        side = df.pop("_side")
+        return index_chain(OptionChain(df[side == "calls"], df[side == "puts"], None))
+    if kind == "expirations":
+        return tuple(df["expiration"])
+    if kind == "history":
+        return df.set_index("date")
+    return float(df["spot"].iloc[0])
+
+
+class MarketDataCache:
+    # Cache LRU partagé entre sessions Streamlit, avec TTL par type de donnée
+    # et snapshots disque optionnels pour redémarrer à chaud.
+
+    def __init__(self, provider=None, ttl=None, max_bytes=DEFAULT_MAX_BYTES,
+                 disk_dir=None, disk_format="parquet", clock=time.time, on_fetch=None):
+        if disk_format not in ("parquet", "feather"):
+            raise ValueError(f"disk_format inconnu : {disk_format}")
+        self.provider = provider or YFinanceProvider()
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_format = disk_format
+        self.clock = clock
+        # Appelé avec (kind, key, value) après chaque fetch réseau, ex. pour archiver les chaînes
+        self.on_fetch = on_fetch
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {kind: {"hits": 0, "misses": 0, "disk_hits": 0} for kind in self.ttl}
+        self._evictions = 0
+
+    def expirations(self, ticker):
+        return self._get("expirations", (ticker,), lambda: self.provider.expirations(ticker))
+
+    def option_chain(self, ticker, exp, max_age=None):
+        return self._get("chain", (ticker, exp), lambda: index_chain(self.provider.option_chain(ticker, exp)), max_age)
+
+    def spot(self, ticker, max_age=None):
+        return self._get("spot", (ticker,), lambda: self.provider.spot(ticker), max_age)
+
+    def history(self, ticker, period="1y"):
+        return self._get("history", (ticker, period), lambda: self.provider.history(ticker, period))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "kinds": {kind: dict(counts) for kind, counts in self._stats.items()},
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _get(self, kind, key, loader, max_age=None):
+        # max_age resserre le TTL pour un appel (mode live) sans changer celui des autres sessions
+        now = self.clock()
+        ttl = self.ttl[kind] if max_age is None else min(self.ttl[kind], max_age)
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and now - entry[0] < ttl:
+                self._entries.move_to_end((kind, key))
+                self._stats[kind]["hits"] += 1
+                return entry[1]
+            self._stats[kind]["misses"] += 1
+
+        value, fetched_at = self._load_disk(kind, key, now, ttl)
+        if value is None:
+            # Le réseau est appelé hors du verrou pour ne pas bloquer les autres sessions
+            value, fetched_at = loader(), now
+            self._save_disk(kind, key, value, fetched_at)
+            self._store(kind, key, value, fetched_at)
+            # Après _store : même si le hook échoue, la donnée fetchée reste en cache
+            if self.on_fetch is not None:
+                self.on_fetch(kind, key, value)
+            return value
+        self._store(kind, key, value, fetched_at)
+        return value
+
+    def _store(self, kind, key, value, fetched_at):
+        size = _sizeof(value)
+        with self._lock:
+            old = self._entries.pop((kind, key), None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[(kind, key)] = (fetched_at, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._evictions += 1
+
+    def _disk_path(self, kind, key):
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", "__".join(key))
+        return os.path.join(self.disk_dir, kind, f"{name}.{self.disk_format}")
+
+    def _load_disk(self, kind, key, now, ttl):
+        if self.disk_dir is None:
+            return None, None
+        path = self._disk_path(kind, key)
+        try:
+            fetched_at = os.path.getmtime(path)
+            if now - fetched_at >= ttl:
+                return None, None
+            reader = pd.read_parquet if self.disk_format == "parquet" else pd.read_feather
+            value = _from_frame(kind, reader(path))
+        except (OSError, ImportError, ValueError, TypeError):
+            return None, None
+        with self._lock:
+            self._stats[kind]["disk_hits"] += 1
+        return value, fetched_at
+
+    def _save_disk(self, kind, key, value, fetched_at):
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(kind, key)
+        tmp = f"{path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            df = _to_frame(kind, value)
+            if self.disk_format == "parquet":
+                df.to_parquet(tmp, index=False)
+            else:
+                df.reset_index(drop=True).to_feather(tmp)
+            os.replace(tmp, path)
+            # Le mtime porte l'horodatage du fetch, relu au démarrage pour appliquer le TTL
+            os.utime(path, (fetched_at, fetched_at))
+        except (OSError, ImportError, ValueError, TypeError):
+            # pyarrow absent ou disque indisponible : on reste sur le cache mémoire
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+_cache = MarketDataCache(disk_dir=os.environ.get("OPTIONS_DASHBOARD_CACHE_DIR"))
+
+
+def configure_cache(**kwargs):
+    global _cache
+    _cache = MarketDataCache(**kwargs)
+    return _cache
+
+
+def get_cache():
+    return _cache
+
+
+@profiled()
 def list_expirations(ticker: str):
     try:
-        t = yf.Ticker(ticker)
-        return t.options
+        return _cache.expirations(ticker)
     except Exception as e:
         st.error(f"Erreur récupération des dates d'échéance : {e}")
         return []
 
-def get_option_chain(ticker: str, exp: str):
+@profiled()
+def get_option_chain(ticker: str, exp: str, max_age=None):
     try:
-        t = yf.Ticker(ticker)
-        return t.option_chain(exp)
+        return _cache.option_chain(ticker, exp, max_age)
     except Exception as e:
         st.error(f"Erreur récupération de la chaîne d'options : {e}")
-        return None
\ No newline at end of file
+        return None
+
+@profiled()
+def get_spot(ticker: str, max_age=None):
+    try:
+        return _cache.spot(ticker, max_age)
+    except Exception as e:
+        st.error(f"Erreur récupération du prix spot : {e}")
+        return None
+
+
+def chain_to_long(chain, exp):
+    frames = [chain.calls.to_frame().assign(type="call"), chain.puts.to_frame().assign(type="put")]
+    df = pd.concat(frames, ignore_index=True)
+    df.insert(0, "expiry", exp)
+    return df
+
+
+def _fetch_chain(cache, ticker, exp, retries, backoff, sleep):
+    for attempt in range(retries + 1):
+        try:
+            return cache.option_chain(ticker, exp)
+        except Exception:
+            if attempt == retries:
+                raise
+            sleep(backoff * 2 ** attempt)
+
+
+def iter_option_surface(ticker, expirations=None, max_workers=8, retries=2,
+                        backoff=0.5, cache=None, sleep=time.sleep):
+    # Renvoie (échéance, chaîne au format long, erreur) dans l'ordre d'arrivée
+    cache = cache or _cache
+    if expirations is None:
+        expirations = cache.expirations(ticker)
+    if not expirations:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(expirations)))
+    try:
+        futures = {
+            pool.submit(_fetch_chain, cache, ticker, exp, retries, backoff, sleep): exp
+            for exp in expirations
+        }
+        for future in as_completed(futures):
+            exp = futures[future]
+            try:
+                yield exp, chain_to_long(future.result(), exp), None
+            except Exception as e:
+                yield exp, None, e
+    finally:
+        # Générateur fermé avant la fin (break, exception chez l'appelant) : les fetchs
+        # encore en file sont annulés au lieu d'être attendus
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@profiled()
+def load_option_surface(ticker, expirations=None, on_chain=None, **kwargs):
+    frames, failed = [], {}
+    for exp, df, error in iter_option_surface(ticker, expirations, **kwargs):
+        if error is not None:
+            failed[exp] = error
+            continue
+        frames.append(df)
+        if on_chain is not None:
+            on_chain(exp, df)
+
+    if not frames:
+        surface = pd.DataFrame(columns=["expiry", "type", "strike"])
+    else:
+        surface = pd.concat(frames, ignore_index=True)
+        surface = surface.sort_values(["expiry", "type", "strike"], ignore_index=True)
+    surface.attrs["failed"] = failed
+    return surface